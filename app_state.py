@@ -0,0 +1,103 @@
+"""Cached view of the Android device's foreground app and screen state.
+
+A background thread polls ``device.app_current()`` and ``device.info`` at a
+bounded rate so gesture gating reads a local value instead of doing an ADB
+round-trip per frame. Sending app start/stop updates the cache immediately
+and triggers a refresh; for a short settle time afterwards a refresh that
+still shows the old app (the launch has not finished yet) is ignored.
+"""
+import threading
+import time
+
+
+class ForegroundAppTracker:
+    """Background-refreshed foreground package / screen state"""
+
+    def __init__(self, device, refresh_interval=1.0, settle_time=3.0):
+        self.device = device
+        self.refresh_interval = refresh_interval  # Max one device poll per interval
+        self.settle_time = settle_time  # How long our own start/stop wins over device reports
+        self.package = None  # None = unknown yet
+        self.screen_on = None
+        self.updated_at = 0.0
+        self._expected = None  # (package, until) after we sent a start/stop
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_error = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="app-state-tracker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Clear before polling: a wake-up that arrives during refresh() triggers another one
+            self._wake.clear()
+            self.refresh()
+            self._wake.wait(self.refresh_interval)
+
+    def refresh(self):
+        """Poll the device once and update the cache"""
+        try:
+            package = self.device.app_current().get("package", "")
+            screen_on = self.device.info.get("screenOn", True)
+        except Exception as e:
+            # Log each distinct error once instead of on every poll
+            if str(e) != self._last_error:
+                print(f"Failed to read foreground app: {e}")
+                self._last_error = str(e)
+            return
+        self._last_error = None
+        with self._lock:
+            if self._expected is not None:
+                expected_package, until = self._expected
+                if package == expected_package or time.time() >= until:
+                    self._expected = None
+                else:
+                    # Launch/stop still in flight, keep our own view for now
+                    package = expected_package
+            self.package = package
+            self.screen_on = screen_on
+            self.updated_at = time.time()
+
+    def invalidate(self):
+        """Drop a pending start/stop expectation (e.g. the call failed) and refresh as soon as possible"""
+        with self._lock:
+            self._expected = None
+        self._wake.set()
+
+    def note_app_started(self, package):
+        with self._lock:
+            self.package = package
+            self._expected = (package, time.time() + self.settle_time)
+        self._wake.set()
+
+    def note_app_stopped(self, package):
+        with self._lock:
+            if self.package == package:
+                self.package = ""
+            self._expected = ("", time.time() + self.settle_time)
+        self._wake.set()
+
+    def is_foreground(self, package):
+        """True when package is the cached foreground app and the screen is on"""
+        return self.package == package and self.screen_on is not False
+
+    def wait_for_foreground(self, package, timeout=3.0, poll_interval=0.25):
+        """Poll the device until package is in the foreground; returns False on timeout"""
+        deadline = time.time() + timeout
+        while True:
+            self.refresh()
+            if self.package == package:
+                return True
+            if time.time() >= deadline:
+                return False
+            time.sleep(poll_interval)
@@ -0,0 +1,212 @@
+"""Batch gesture annotation of recorded videos.
+
+Runs MediaPipe Hands over every video in a directory using a process pool
+and writes, per video, a columnar ``.npz`` file with per-frame landmarks and
+the gesture events the Android controller would have detected. Every job
+(a whole file or one segment) gets a fresh tracking-mode Hands graph, so no
+tracking state leaks from one video or segment into the next; a segment
+starts with warm-up frames from before its start, a whole file starts cold
+at frame 0 like a live session.
+
+Usage:
+    python batch_annotate.py footage/ -o annotations/ --workers 8 --segment-seconds 120
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+import gestures
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+# Per-worker settings, set once by _init_worker
+_hands_options = {}
+_flip = True
+
+
+def _init_worker(max_num_hands, min_detection_confidence, min_tracking_confidence, flip):
+    """Store the Hands settings of this worker process"""
+    global _hands_options, _flip
+    # One OpenCV thread per worker: the pool already uses every core
+    cv2.setNumThreads(1)
+    _hands_options = dict(max_num_hands=max_num_hands,
+                          min_detection_confidence=min_detection_confidence,
+                          min_tracking_confidence=min_tracking_confidence)
+    _flip = flip
+
+
+def probe_video(path):
+    """Return (frame_count, fps) of a video file"""
+    cap = cv2.VideoCapture(path)
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    finally:
+        cap.release()
+    return frame_count, fps
+
+
+def plan_jobs(paths, segment_seconds, overlap_seconds):
+    """Split videos into (path, fps, warmup_start, start, end) frame ranges.
+
+    Returns (jobs, skipped): skipped lists the videos without a readable frame count.
+    """
+    jobs = []
+    skipped = []
+    for path in paths:
+        frame_count, fps = probe_video(path)
+        if frame_count <= 0:
+            print(f"Skipping {path}: cannot read frame count")
+            skipped.append(path)
+            continue
+        if segment_seconds <= 0:
+            jobs.append((path, fps, 0, 0, frame_count))
+            continue
+        segment = max(1, int(segment_seconds * fps))
+        overlap = int(overlap_seconds * fps)
+        for start in range(0, frame_count, segment):
+            end = min(start + segment, frame_count)
+            # Warm-up frames let the tracker and gesture state settle before the segment starts
+            jobs.append((path, fps, max(0, start - overlap), start, end))
+    return jobs, skipped
+
+
+def annotate_segment(job):
+    """Worker: annotate one frame range of a video and return its columns"""
+    path, fps, warmup_start, start, end = job
+    cap = cv2.VideoCapture(path)
+    if warmup_start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, warmup_start)
+    # Fresh tracker per job: the warm-up frames (if any) are all the history it gets
+    hands_graph = mp.solutions.hands.Hands(**_hands_options)
+
+    detector = gestures.GestureEventDetector()
+    rows = {"frame": [], "hand": [], "handedness": [], "score": [], "pose": [], "landmarks": []}
+    events = {"frame": [], "event": []}
+    started = time.perf_counter()
+
+    frame_idx = warmup_start
+    while frame_idx < end:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if _flip:
+            # Same orientation as the live scripts, so handedness labels match
+            frame = cv2.flip(frame, 1)
+        result = hands_graph.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+        hands = []
+        for hand_idx, hand_landmarks in enumerate(result.multi_hand_landmarks or []):
+            label = "Unknown"
+            score = 0.0
+            if result.multi_handedness and hand_idx < len(result.multi_handedness):
+                label = result.multi_handedness[hand_idx].classification[0].label
+                score = result.multi_handedness[hand_idx].classification[0].score
+            landmarks = hand_landmarks.landmark
+            hands.append((label, landmarks))
+            if frame_idx >= start:
+                rows["frame"].append(frame_idx)
+                rows["hand"].append(hand_idx)
+                rows["handedness"].append(label)
+                rows["score"].append(score)
+                rows["pose"].append((gestures.classify_pose(landmarks) or "") if label == "Right" else "")
+                rows["landmarks"].append([(lm.x, lm.y, lm.z) for lm in landmarks])
+
+        new_events = detector.update(hands, frame_idx / fps)
+        if frame_idx >= start:
+            for event in new_events:
+                events["frame"].append(frame_idx)
+                events["event"].append(event)
+        frame_idx += 1
+
+    cap.release()
+    hands_graph.close()
+    elapsed = time.perf_counter() - started
+    return path, start, {
+        "frame": np.asarray(rows["frame"], dtype=np.int32),
+        "hand": np.asarray(rows["hand"], dtype=np.int8),
+        "handedness": np.asarray(rows["handedness"], dtype="U7"),
+        "score": np.asarray(rows["score"], dtype=np.float32),
+        "pose": np.asarray(rows["pose"], dtype="U8"),
+        "landmarks": np.asarray(rows["landmarks"], dtype=np.float32).reshape(-1, gestures.NUM_LANDMARKS, 3),
+        "event_frame": np.asarray(events["frame"], dtype=np.int32),
+        "event": np.asarray(events["event"], dtype="U12"),
+    }, frame_idx - warmup_start, elapsed
+
+
+def write_annotations(output_dir, path, fps, segments):
+    """Merge the segments of one video (ordered by start frame) into <name>.npz"""
+    segments = [columns for _, columns in sorted(segments, key=lambda s: s[0])]
+    merged = {key: np.concatenate([columns[key] for columns in segments]) for key in segments[0]}
+    merged["time_s"] = merged["frame"] / fps
+    merged["event_time_s"] = merged["event_frame"] / fps
+    out_path = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + ".npz")
+    np.savez_compressed(out_path, fps=np.float32(fps), source=path, **merged)
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Annotate a directory of videos with hand landmarks and gesture events")
+    parser.add_argument("input_dir", help="Directory containing video files")
+    parser.add_argument("-o", "--output-dir", default="annotations", help="Where to write <video>.npz files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    parser.add_argument("--segment-seconds", type=float, default=0,
+                        help="Split videos into segments of this length (0 = one job per file)")
+    parser.add_argument("--overlap-seconds", type=float, default=1.0,
+                        help="Warm-up frames processed before each segment and discarded")
+    parser.add_argument("--max-num-hands", type=int, default=2)
+    parser.add_argument("--min-detection-confidence", type=float, default=0.7)
+    parser.add_argument("--min-tracking-confidence", type=float, default=0.7)
+    parser.add_argument("--no-flip", action="store_true", help="Do not mirror frames (footage already mirrored)")
+    args = parser.parse_args()
+
+    paths = sorted(os.path.join(args.input_dir, name) for name in os.listdir(args.input_dir)
+                   if name.lower().endswith(VIDEO_EXTENSIONS))
+    if not paths:
+        print(f"No video files found in {args.input_dir}")
+        return
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    jobs, skipped = plan_jobs(paths, args.segment_seconds, args.overlap_seconds)
+    remaining = {}
+    for path, fps, *_ in jobs:
+        remaining[path] = remaining.get(path, 0) + 1
+    fps_by_path = {path: fps for path, fps, *_ in jobs}
+    segments = {path: [] for path in remaining}
+    print(f"Annotating {len(remaining)} videos in {len(jobs)} jobs with {args.workers} workers")
+
+    started = time.perf_counter()
+    total_frames = 0
+    empty = []  # Jobs that could not read a single frame
+    initargs = (args.max_num_hands, args.min_detection_confidence, args.min_tracking_confidence, not args.no_flip)
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=initargs) as pool:
+        # Longest jobs first keeps the pool busy until the end
+        jobs.sort(key=lambda job: job[4] - job[2], reverse=True)
+        futures = [pool.submit(annotate_segment, job) for job in jobs]
+        for future in as_completed(futures):
+            path, start, columns, frames, elapsed = future.result()
+            total_frames += frames
+            if frames == 0:
+                empty.append(f"{path} @ {start}")
+            print(f"{os.path.basename(path)} @ {start}: {frames} frames in {elapsed:.1f}s ({frames / max(elapsed, 1e-6):.1f} fps)")
+            segments[path].append((start, columns))
+            remaining[path] -= 1
+            if remaining[path] == 0:
+                out_path = write_annotations(args.output_dir, path, fps_by_path[path], segments.pop(path))
+                print(f"Wrote {out_path}")
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {total_frames} frames in {elapsed:.1f}s ({total_frames / max(elapsed, 1e-6):.1f} fps overall)")
+    if skipped:
+        print(f"Not annotated ({len(skipped)} videos with frame count 0):\n  " + "\n  ".join(skipped))
+    if empty:
+        print(f"No frames read ({len(empty)} jobs):\n  " + "\n  ".join(empty))
+
+
+if __name__ == "__main__":
+    main()
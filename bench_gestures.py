@@ -0,0 +1,127 @@
+"""Deterministic gesture microbenchmarks on synthetic landmark streams.
+
+Runs every synthetic scenario through the decision classes the three
+scripts call every frame (AndroidController for hand_detection_android.py,
+action_script_controller / facebook_script_controller for
+hand_detection_action.py / hand_facebook.py) with fake actuators, checks
+that the expected action fires, and reports
+gesture latency (decisive pose start → action) and per-frame rule cost.
+Needs no camera, video, mediapipe or device, so it runs in CI; exits with
+status 1 when an expected action is missing or an unexpected one fires.
+
+Usage:
+    python bench_gestures.py
+    python bench_gestures.py --noise 0.002 --dropout 0.05 --seed 7 --repeat 50
+    python bench_gestures.py --handedness Left
+"""
+import argparse
+import sys
+import time
+
+import gestures
+import synthetic_hands
+from controller import AndroidController, action_script_controller, facebook_script_controller
+from fake_device import FakeDevice
+
+# Action each script should take for each scenario (None = no action at all)
+EXPECTED = {
+    "android": {"ok": "ok", "like": "heart", "scroll_down": "scroll_down", "scroll_up": "scroll_up",
+                "swipe_right": "scroll_down", "swipe_left": "scroll_up", "cross_arms": "cross_arms"},
+    "action": {"scroll_down": "page_down", "scroll_up": "page_up", "swipe_right": "page_down"},
+    "facebook": {"scroll_down": "smooth_scroll_down", "scroll_up": "smooth_scroll_up"},
+}
+# Scenarios whose decisive gesture shows both hands, so --handedness does not change it
+TWO_HANDED = {"cross_arms"}
+
+
+def expected_action(expectations, name, handedness):
+    """Mirror the expectations for left-handed input: one-hand gestures are right hand only"""
+    if handedness == "Right" or name in TWO_HANDED:
+        return expectations.get(name)
+    return None
+
+
+def make_controller(profile):
+    """Fresh controller for a script profile, with a fake actuator"""
+    if profile == "android":
+        # The simulated clock does not advance during the like's double tap
+        return AndroidController(FakeDevice(), sleep=lambda seconds: None)
+    if profile == "action":
+        return action_script_controller(lambda action, y: None)
+    return facebook_script_controller(lambda action, y: None)
+
+
+def run_scenario(profile, frames):
+    """Return (actions with timestamps, total step time) for one pass"""
+    controller = make_controller(profile)
+    actions = []
+    elapsed = 0.0
+    for now, hands in frames:
+        started = time.perf_counter()
+        taken = controller.step(hands, now)
+        elapsed += time.perf_counter() - started
+        actions.extend((now, action) for action in taken)
+    return actions, elapsed
+
+
+def check(expected, onset, actions):
+    """Return (ok, latency in seconds or None, description)"""
+    after = [(t, a) for t, a in actions if onset is not None and t >= onset]
+    if expected is None:
+        unexpected = after if onset is not None else actions
+        return not unexpected, None, f"unexpected {unexpected}" if unexpected else "no action"
+    if not after:
+        return False, None, f"missing {expected}"
+    t, action = after[0]
+    if action != expected:
+        return False, None, f"got {action}, expected {expected}"
+    return True, t - onset, action
+
+
+def bench_rules(frames, repeat):
+    """Per-frame cost of the pose rules alone (finger states + classify_pose)"""
+    hands = [landmarks for _, frame_hands in frames for label, landmarks in frame_hands if label == "Right"]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for landmarks in hands:
+            gestures.classify_pose(landmarks, gestures.finger_states(landmarks))
+    return (time.perf_counter() - started) / max(len(hands) * repeat, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic gesture microbenchmarks")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--noise", type=float, default=0.0, help="Landmark jitter std-dev (normalized units)")
+    parser.add_argument("--dropout", type=float, default=0.0, help="Probability of a frame without hands")
+    parser.add_argument("--handedness", default="Right", choices=("Right", "Left"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions per scenario")
+    args = parser.parse_args()
+
+    failures = 0
+    all_frames = []
+    print(f"{'scenario':12s} {'script':9s} {'result':22s} {'latency':>9s} {'us/frame':>9s}")
+    for name, (segments, _) in synthetic_hands.SCENARIOS.items():
+        frames = list(synthetic_hands.generate(segments, fps=args.fps, noise=args.noise, dropout=args.dropout,
+                                               handedness=args.handedness, seed=args.seed))
+        all_frames.extend(frames)
+        onset = synthetic_hands.scenario_onset(name, args.fps)
+        for profile, expectations in EXPECTED.items():
+            expected = expected_action(expectations, name, args.handedness)
+            actions, _ = run_scenario(profile, frames)
+            ok, latency, description = check(expected, onset, actions)
+            elapsed = sum(run_scenario(profile, frames)[1] for _ in range(args.repeat))
+            per_frame = elapsed / (len(frames) * args.repeat) * 1e6
+            latency_text = f"{latency * 1000:.0f}ms" if latency is not None else "-"
+            print(f"{name:12s} {profile:9s} {('ok ' if ok else 'FAIL ') + description:22s} "
+                  f"{latency_text:>9s} {per_frame:9.1f}")
+            failures += not ok
+
+    print(f"\nPose rules: {bench_rules(all_frames, args.repeat) * 1e6:.2f} us per right hand")
+    if failures:
+        print(f"{failures} scenario checks failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
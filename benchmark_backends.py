@@ -0,0 +1,88 @@
+"""Compare the legacy and Tasks inference backends on a recorded video.
+
+For every backend the same frames are fed through ``process()`` as fast as
+possible. Reports loop throughput, how many frames produced a fresh result,
+and how often the right-hand pose (gestures.classify_pose) agrees with the
+legacy backend on the same frame.
+
+Usage:
+    python benchmark_backends.py footage/session.mp4 --model hand_landmarker.task
+"""
+import argparse
+import time
+
+import cv2
+
+import gestures
+from inference_backends import create_hands_backend
+
+
+def load_frames(path, max_frames):
+    """Decode (mirrored, RGB) frames up front so decoding is not part of the timing"""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+
+def right_hand_pose(result):
+    for hand_idx, hand_landmarks in enumerate(result.multi_hand_landmarks or []):
+        if (result.multi_handedness and hand_idx < len(result.multi_handedness)
+                and result.multi_handedness[hand_idx].classification[0].label == "Right"):
+            return gestures.classify_pose(hand_landmarks.landmark) or "none"
+    return "no_hand"
+
+
+def run_backend(name, frames, model_path, fps):
+    backend = create_hands_backend(name, model_path=model_path)
+    poses = []
+    fresh = 0
+    last_result = None
+    started = time.perf_counter()
+    for idx, frame in enumerate(frames):
+        if fps:
+            # Pace like a live camera so the async backend can overlap work
+            delay = started + idx / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        result = backend.process(frame)
+        if result is not last_result:
+            fresh += 1
+        last_result = result
+        poses.append(right_hand_pose(result))
+    elapsed = time.perf_counter() - started
+    backend.close()
+    return poses, fresh, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hand inference backends")
+    parser.add_argument("video")
+    parser.add_argument("--model", default="hand_landmarker.task", help="HandLandmarker .task file")
+    parser.add_argument("--backends", default="legacy,tasks_video,tasks")
+    parser.add_argument("--max-frames", type=int, default=600)
+    parser.add_argument("--fps", type=float, default=0, help="Pace frames at this rate (0 = as fast as possible)")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.max_frames)
+    print(f"Loaded {len(frames)} frames from {args.video}")
+    reference = None
+    for name in args.backends.split(","):
+        poses, fresh, elapsed = run_backend(name, frames, args.model, args.fps)
+        line = (f"{name:12s} {len(frames) / elapsed:7.1f} fps loop  "
+                f"{fresh / elapsed:7.1f} fresh results/s  {elapsed * 1000 / len(frames):6.2f} ms/frame")
+        if reference is None:
+            reference = poses
+        else:
+            agree = sum(a == b for a, b in zip(poses, reference)) / max(len(poses), 1)
+            line += f"  pose agreement vs {args.backends.split(',')[0]}: {agree:.1%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
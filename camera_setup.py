@@ -0,0 +1,171 @@
+"""Camera configuration profiles with capability probing.
+
+cv2.VideoCapture opens cameras with driver defaults, which on many UVC
+cameras means uncompressed YUYV at a low frame rate and a deep frame buffer.
+open_camera() probes FOURCC / resolution / FPS combinations in order of
+preference, keeps the first one the camera actually delivers at (close to)
+its requested rate, and caches the choice per device in camera_profiles.json
+so later starts skip the probe. The achieved capture rate is measured and
+reported either way.
+"""
+import json
+import os
+import time
+from collections import namedtuple
+
+import cv2
+
+CaptureProfile = namedtuple("CaptureProfile", "fourcc width height fps")
+
+# In order of preference for low input latency
+DEFAULT_CANDIDATES = [
+    CaptureProfile("MJPG", 640, 480, 60),
+    CaptureProfile("MJPG", 640, 480, 30),
+    CaptureProfile("MJPG", 1280, 720, 30),
+    CaptureProfile("YUYV", 640, 480, 30),
+    CaptureProfile("YUYV", 320, 240, 30),
+]
+DEFAULT_CACHE_PATH = "camera_profiles.json"
+# A profile is accepted when it delivers at least this share of its requested FPS
+MIN_RATE_RATIO = 0.85
+
+
+def device_key(index):
+    """Stable-ish identifier of a camera for the profile cache"""
+    name_path = f"/sys/class/video4linux/video{index}/name"
+    try:
+        with open(name_path) as f:
+            return f"{index}:{f.read().strip()}"
+    except OSError:
+        return f"{index}"
+
+
+def fourcc_string(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def apply_profile(cap, profile):
+    """Request a profile; return the profile the driver actually applied"""
+    # FOURCC first: many drivers only offer high FPS for compressed formats
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile.fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile.height)
+    cap.set(cv2.CAP_PROP_FPS, profile.fps)
+    # Keep only the newest frame in the driver queue (ignored by some backends)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return CaptureProfile(fourcc_string(cap.get(cv2.CAP_PROP_FOURCC)),
+                          int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                          int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                          cap.get(cv2.CAP_PROP_FPS))
+
+
+def measure_fps(cap, frames=30, warmup=5):
+    """Achieved capture rate over a few frames (0.0 if reads fail)"""
+    for _ in range(warmup):
+        if not cap.read()[0]:
+            return 0.0
+    started = time.perf_counter()
+    for _ in range(frames):
+        if not cap.read()[0]:
+            return 0.0
+    return frames / (time.perf_counter() - started)
+
+
+def probe(cap, candidates=DEFAULT_CANDIDATES, frames=30):
+    """Try candidates in order; return (profile, measured fps) of the best one or (None, 0.0)"""
+    best, best_fps = None, 0.0
+    for candidate in candidates:
+        actual = apply_profile(cap, candidate)
+        if (actual.fourcc, actual.width, actual.height) != (candidate.fourcc, candidate.width, candidate.height):
+            print(f"Camera: {candidate.fourcc} {candidate.width}x{candidate.height} not supported "
+                  f"(got {actual.fourcc} {actual.width}x{actual.height})")
+            continue
+        measured = measure_fps(cap, frames)
+        print(f"Camera: {candidate.fourcc} {candidate.width}x{candidate.height}@{candidate.fps} "
+              f"→ {measured:.1f} fps")
+        if measured >= candidate.fps * MIN_RATE_RATIO:
+            return candidate, measured
+        if measured > best_fps:
+            best, best_fps = candidate, measured
+    return best, best_fps
+
+
+def load_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path, cache):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def open_camera(index=0, candidates=DEFAULT_CANDIDATES, cache_path=DEFAULT_CACHE_PATH,
+                reprobe=False, probe_frames=30):
+    """Open a camera with its cached or freshly probed profile.
+
+    Returns (cap, profile, measured_fps); profile is None when no candidate
+    could be applied and the driver defaults are in use.
+    """
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        print(f"Camera {index}: could not be opened")
+        return cap, None, 0.0
+
+    key = device_key(index)
+    cache = load_cache(cache_path) if cache_path else {}
+    profile = None
+    measured = 0.0
+    cached = cache.get(key)
+    if cached and not reprobe:
+        profile = CaptureProfile(cached["fourcc"], cached["width"], cached["height"], cached["fps"])
+        actual = apply_profile(cap, profile)
+        if (actual.fourcc, actual.width, actual.height) == (profile.fourcc, profile.width, profile.height):
+            measured = measure_fps(cap, probe_frames)
+        else:
+            print(f"Camera {index}: cached profile no longer applies, probing again")
+            profile = None
+
+    if profile is None:
+        profile, measured = probe(cap, candidates, probe_frames)
+        if profile is None:
+            print(f"Camera {index}: no candidate profile applied, using driver defaults")
+            return cap, None, measure_fps(cap, probe_frames)
+        # The probe may have ended on a different candidate
+        apply_profile(cap, profile)
+        if cache_path:
+            cache[key] = dict(profile._asdict(), measured_fps=round(measured, 1),
+                              probed_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+            save_cache(cache_path, cache)
+
+    print(f"Camera {index} ({key}): {profile.fourcc} {profile.width}x{profile.height}@{profile.fps}, "
+          f"achieved {measured:.1f} fps")
+    return cap, profile, measured
+
+
+class CaptureRateMeter:
+    """Achieved frame rate over a sliding window, for reporting while running"""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self.count = 0
+        self.started = None
+        self.fps = 0.0
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if self.started is None:
+            self.started = now
+        self.count += 1
+        elapsed = now - self.started
+        if elapsed >= self.window:
+            self.fps = (self.count - 1) / elapsed
+            self.count = 1
+            self.started = now
+        return self.fps
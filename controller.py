@@ -0,0 +1,218 @@
+"""Android controller decisions, decoupled from the camera loop.
+
+AndroidController is the decision logic of hand_detection_android.py (OK
+opens TikTok, cross arms closes it, heart likes, scroll pose swipes); the
+script calls step() once per frame and only draws the outcomes. It takes the
+clock from the caller, so shm_pipeline.py, soak_test.py and
+bench_gestures.py drive the same code with live, replayed or synthetic input.
+"""
+import threading
+import time
+
+import gesture_config
+import gestures
+from rate_limit import ActionLimiter, android_limiter
+
+TIKTOK_PACKAGE = gesture_config.SCHEMA["packages"]["tiktok"]
+SWIPE = gesture_config.defaults()["swipe"]
+
+
+class AndroidController:
+    """Gesture events → uiautomator2 actions with the controller's per-action rate limits.
+
+    After every step(), outcomes lists (event, action, outcome) with outcome
+    "executed", "limited" (rate limit / debounce) or "failed".
+    """
+
+    def __init__(self, device, limiter=None, package=TIKTOK_PACKAGE, app_tracker=None,
+                 thresholds=gestures.DEFAULT_THRESHOLDS, scroll=None, swipe=None, tap_interval=0.1,
+                 sleep=time.sleep):
+        self.device = device
+        self.app_tracker = app_tracker  # Optional ForegroundAppTracker; local flag otherwise
+        self.limiter = limiter if limiter is not None else android_limiter()
+        self.package = package
+        info = device.info
+        self.screen_width = info["displayWidth"]
+        self.screen_height = info["displayHeight"]
+        self.detector = gestures.GestureEventDetector(gestures.ScrollTracker(**(scroll or {})), thresholds)
+        self.swipe = dict(SWIPE, **(swipe or {}))  # start / end (fraction of screen height), duration
+        self.tap_interval = tap_interval  # Pause between the two taps of a like
+        self.sleep = sleep  # Simulated-clock callers pass a no-op
+        self.tiktok_open = False
+        self.actions = 0
+        self.outcomes = []
+
+    @classmethod
+    def from_config(cls, device, config, app_tracker=None, **kwargs):
+        """Controller with the settings of a gesture_config configuration"""
+        return cls(device, android_limiter(**config["rate_limits"]), config["packages"]["tiktok"], app_tracker,
+                   gesture_config.thresholds(config), config["scroll"], config["swipe"],
+                   config["like"]["tap_interval"], **kwargs)
+
+    def apply_config(self, config):
+        """Switch to a new configuration; raises and changes nothing if it cannot be built"""
+        limiter = android_limiter(**config["rate_limits"])
+        tracker = gestures.ScrollTracker(**config["scroll"])
+        thresholds = gesture_config.thresholds(config)
+        self.limiter.reconfigure(limiter)
+        tracker.prev_x = self.detector.scroll_tracker.prev_x
+        self.detector.scroll_tracker = tracker
+        self.detector.thresholds = thresholds
+        self.swipe = dict(config["swipe"])
+        self.tap_interval = config["like"]["tap_interval"]
+        self.package = config["packages"]["tiktok"]
+
+    def run_operation(self, operation):
+        """Open/close TikTok on a daemon thread; the cached app state is updated right away"""
+        def operation_thread():
+            try:
+                if operation == "open":
+                    self.device.app_start(self.package)
+                else:
+                    self.device.app_stop(self.package)
+            except Exception as e:
+                print(f"Failed to {operation} TikTok: {e}")
+                if self.app_tracker is not None:
+                    # Drop our own expectation and ask the device what is really in front
+                    self.app_tracker.invalidate()
+
+        self.tiktok_open = operation == "open"
+        if self.app_tracker is not None:
+            if operation == "open":
+                self.app_tracker.note_app_started(self.package)
+            else:
+                self.app_tracker.note_app_stopped(self.package)
+
+        thread = threading.Thread(target=operation_thread)
+        thread.daemon = True
+        thread.start()
+
+    def is_tiktok_open(self):
+        if self.app_tracker is not None:
+            return self.app_tracker.is_foreground(self.package)
+        return self.tiktok_open
+
+    def _swipe(self, start, end):
+        x = self.screen_width // 2
+        self.device.swipe(x, self.screen_height * start, x, self.screen_height * end,
+                          duration=self.swipe["duration"])
+
+    def step(self, frame_hands, now, poses=None):
+        """Feed one frame of (handedness, landmarks); return the actions taken.
+
+        poses: optional static pose per hand (learned classifier) instead of the rules.
+        """
+        taken = []
+        self.outcomes = []
+        for event in self.detector.update(frame_hands, now, poses):
+            tiktok_open = self.is_tiktok_open()
+            if event == "ok" and not tiktok_open:
+                action, target = "open", self.package
+            elif event == "cross_arms":
+                action, target = "close", self.package
+            elif event == "heart" and tiktok_open:
+                action, target = "like", self.package
+            elif event in ("scroll_down", "scroll_up"):
+                action, target = event, None
+            else:
+                continue
+            if not self.limiter.allow(action, target, now):
+                self.outcomes.append((event, action, "limited"))
+                continue
+            try:
+                if action in ("open", "close"):
+                    self.run_operation(action)
+                elif action == "like":
+                    # Double tap in center
+                    self.device.click(self.screen_width // 2, self.screen_height // 2)
+                    self.sleep(self.tap_interval)
+                    self.device.click(self.screen_width // 2, self.screen_height // 2)
+                elif action == "scroll_down":
+                    self._swipe(self.swipe["start"], self.swipe["end"])
+                else:
+                    self._swipe(self.swipe["end"], self.swipe["start"])
+            except Exception as e:
+                print(f"Error executing {event} action: {e}")
+                self.outcomes.append((event, action, "failed"))
+                continue
+            self.actions += 1
+            self.outcomes.append((event, action, "executed"))
+            taken.append(event)
+        return taken
+
+
+# ScrollTracker settings and rate limits of the desktop scripts
+ACTION_SCRIPT_SCROLL = dict(threshold=0.02, time_threshold=0.1, swipe_right=0.015, swipe_left=None,
+                            up_action="page_down", down_action="page_up", right_action="page_down")
+FACEBOOK_SCRIPT_SCROLL = dict(threshold=0.01, time_threshold=0.05, swipe_right=0.015, swipe_left=None,
+                              up_action="smooth_scroll_down", down_action="smooth_scroll_up",
+                              right_action="page_down")
+
+
+def action_script_limiter():
+    """hand_detection_action.py: each page scroll at most every 0.3 s"""
+    return ActionLimiter({"page_down": (1 / 0.3, 1), "page_up": (1 / 0.3, 1)})
+
+
+def facebook_script_limiter():
+    """hand_facebook.py: smooth scrolls back to back (one every 20 ms)"""
+    return ActionLimiter({"smooth_scroll": (50.0, 1)})
+
+
+class DesktopScrollController:
+    """Right-hand scroll decisions of hand_detection_action.py / hand_facebook.py.
+
+    The scripts call step() once per frame. scroll(action, wrist_y) executes
+    an action; actions not in `handled` are recognized but not executed
+    (hand_facebook.py ignores its swipe action). limit_key maps an action to
+    its rate-limit bucket. continuous=True fires a held scroll again on every
+    frame the wrist moved (hand_facebook.py's smooth scroll) instead of once
+    per gesture; any_hand_swipe=True measures swipes against the previous
+    hand of either side (hand_detection_action.py).
+    """
+
+    def __init__(self, scroll, limiter, tracker_settings, handled=None, limit_key=None,
+                 continuous=False, any_hand_swipe=False):
+        self.scroll = scroll
+        self.limiter = limiter
+        self.limit_key = limit_key or (lambda action: action)
+        self.tracker = gestures.ScrollTracker(**tracker_settings)
+        self.handled = handled
+        self.continuous = continuous
+        self.any_hand_swipe = any_hand_swipe
+        self.last_gesture_state = None
+        self.actions = 0
+
+    def step(self, frame_hands, now):
+        """Feed one frame of (handedness, landmarks); return the actions taken"""
+        taken = []
+        for label, landmarks in frame_hands:
+            wrist = landmarks[gestures.WRIST]
+            if label != "Right":
+                if self.any_hand_swipe:
+                    self.tracker.prev_x = wrist.x
+                continue
+            states = gestures.finger_states(landmarks)
+            action = self.tracker.update(wrist.x, wrist.y, now, active=gestures.is_scroll_pose(states))
+            # A continuous scroll is a new decision whenever the wrist moved
+            state = (action, wrist.y) if action and self.continuous else action
+            if (action and state != self.last_gesture_state and
+                    (self.handled is None or action in self.handled) and
+                    self.limiter.allow(self.limit_key(action), now=now)):
+                self.scroll(action, wrist.y)
+                self.actions += 1
+                taken.append(action)
+            self.last_gesture_state = state
+        return taken
+
+
+def action_script_controller(scroll):
+    """DesktopScrollController of hand_detection_action.py (page scrolls)"""
+    return DesktopScrollController(scroll, action_script_limiter(), ACTION_SCRIPT_SCROLL, any_hand_swipe=True)
+
+
+def facebook_script_controller(scroll):
+    """DesktopScrollController of hand_facebook.py (continuous smooth scroll; the swipe is not executed)"""
+    return DesktopScrollController(scroll, facebook_script_limiter(), FACEBOOK_SCRIPT_SCROLL,
+                                   handled={"smooth_scroll_down", "smooth_scroll_up"},
+                                   limit_key=lambda action: "smooth_scroll", continuous=True)
@@ -0,0 +1,54 @@
+"""Stand-in for a uiautomator2 device, for running the controller logic without a phone.
+
+Implements the part of the u2 device API the controller uses (info, click,
+swipe, app_start, app_stop, app_current) with an optional simulated latency,
+and counts every call. Setting connected = False simulates a dropped ADB
+link: every call, including reading info, raises ConnectionError.
+"""
+import threading
+import time
+
+
+class FakeDevice:
+    """Records device actions instead of sending them over ADB"""
+
+    def __init__(self, width=1080, height=2400, latency=0.0):
+        self._info = {"displayWidth": width, "displayHeight": height, "screenOn": True}
+        self.connected = True
+        self.latency = latency  # Seconds each call blocks, like an ADB round-trip
+        self.current_package = ""
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    @property
+    def info(self):
+        if not self.connected:
+            raise ConnectionError("device offline")
+        return self._info
+
+    def _record(self, name):
+        if not self.connected:
+            raise ConnectionError("device offline")
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def click(self, x, y):
+        self._record("click")
+
+    def swipe(self, fx, fy, tx, ty, duration=None):
+        self._record("swipe")
+
+    def app_start(self, package):
+        self._record("app_start")
+        self.current_package = package
+
+    def app_stop(self, package):
+        self._record("app_stop")
+        if self.current_package == package:
+            self.current_package = ""
+
+    def app_current(self):
+        self._record("app_current")
+        return {"package": self.current_package, "activity": ""}
@@ -0,0 +1,218 @@
+"""Hot-reloadable gesture configuration.
+
+All tunables of the Android controller (gesture thresholds, scroll
+detection, swipe geometry, rate limits, package names) live in a JSON file,
+gesture_config.json by default. ConfigWatcher checks the file's modification
+time on a background thread, parses and validates a changed file there, and
+hands the complete new configuration to the processing loop, which swaps it
+in between two frames via take(). A file that does not parse or validate is
+rejected as a whole and the running configuration stays in place.
+
+Missing keys fall back to the defaults below; unknown keys are errors (they
+are usually typos).
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+
+import gestures
+
+# section → key → (default, min, max) for numbers, or default for strings
+SCHEMA = {
+    "gestures": {
+        "ok_max_distance": (0.05, 0.0, 0.5),
+        "heart_max_tips_distance": (0.15, 0.0, 1.0),
+        "heart_max_length_diff": (0.12, 0.0, 1.0),
+        "cross_arms_overlap": (0.05, -0.5, 0.5),
+        "cross_arms_max_height_diff": (0.25, 0.0, 1.0),
+    },
+    "scroll": {
+        "threshold": (0.02, 0.0, 1.0),
+        "time_threshold": (0.2, 0.0, 5.0),
+        "swipe_right": (0.02, 0.0, 1.0),
+        "swipe_left": (-0.05, -1.0, 0.0),
+    },
+    "swipe": {
+        "start": (0.8, 0.0, 1.0),  # Scroll down swipes from start to end (fraction of screen height)
+        "end": (0.2, 0.0, 1.0),
+        "duration": (0.05, 0.0, 2.0),
+    },
+    "like": {
+        "tap_interval": (0.1, 0.0, 1.0),
+    },
+    "rate_limits": {
+        "scroll_rate": (4.0, 0.01, 100.0),
+        "scroll_burst": (2, 1, 20),
+        "like_rate": (1.0, 0.01, 100.0),
+        "app_rate": (0.5, 0.01, 100.0),
+        "like_debounce": (0.5, 0.0, 10.0),
+        "app_debounce": (1.0, 0.0, 10.0),
+    },
+    "packages": {
+        "tiktok": "com.ss.android.ugc.trill",
+    },
+}
+DEFAULT_CONFIG_PATH = "gesture_config.json"
+
+
+class ConfigError(ValueError):
+    """Invalid gesture configuration"""
+
+
+def defaults():
+    return {section: {key: spec[0] if isinstance(spec, tuple) else spec for key, spec in keys.items()}
+            for section, keys in SCHEMA.items()}
+
+
+def validate(raw):
+    """Merge a parsed config over the defaults; raise ConfigError on any invalid entry"""
+    if not isinstance(raw, dict):
+        raise ConfigError("top level must be an object")
+    config = defaults()
+    for section, values in raw.items():
+        if section not in SCHEMA:
+            raise ConfigError(f"unknown section '{section}'")
+        if not isinstance(values, dict):
+            raise ConfigError(f"section '{section}' must be an object")
+        for key, value in values.items():
+            spec = SCHEMA[section].get(key)
+            name = f"{section}.{key}"
+            if spec is None:
+                raise ConfigError(f"unknown key '{name}'")
+            if isinstance(spec, tuple):
+                default, low, high = spec
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ConfigError(f"'{name}' must be a number")
+                if isinstance(default, int) and not isinstance(value, int):
+                    raise ConfigError(f"'{name}' must be an integer")
+                if not low <= value <= high:
+                    raise ConfigError(f"'{name}' = {value} is outside [{low}, {high}]")
+            elif not isinstance(value, str) or not value.strip():
+                raise ConfigError(f"'{name}' must be a non-empty string")
+            config[section][key] = value
+    if config["swipe"]["start"] == config["swipe"]["end"]:
+        raise ConfigError("'swipe.start' and 'swipe.end' must differ")
+    return config
+
+
+def load(path):
+    """Parse and validate a config file (ConfigError on failure)"""
+    try:
+        with open(path) as f:
+            raw = json.load(f)
+    except ValueError as e:
+        raise ConfigError(f"{path}: {e}") from e
+    return validate(raw)
+
+
+def thresholds(config):
+    """gestures.Thresholds of a config"""
+    return gestures.Thresholds(**config["gestures"])
+
+
+def write_defaults(path):
+    with open(path, "w") as f:
+        json.dump(defaults(), f, indent=2)
+        f.write("\n")
+
+
+class ConfigWatcher:
+    """Watches a config file; validated changes are picked up with take() between frames"""
+
+    def __init__(self, path=DEFAULT_CONFIG_PATH, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.config = None  # Configuration currently in use
+        self.reloads = 0
+        self.rejected = 0
+        self._mtime = None
+        self._pending = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def load_initial(self):
+        """Load the file at startup; defaults if it is missing or invalid"""
+        self._mtime = self._file_mtime()
+        if self._mtime is None:
+            print(f"Config: {self.path} not found, using defaults")
+            self.config = defaults()
+            return self.config
+        try:
+            self.config = load(self.path)
+            print(f"Config: loaded {self.path}")
+        except (OSError, ConfigError) as e:
+            print(f"Config: {e}; using defaults")
+            self.config = defaults()
+        return self.config
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop_event.wait(self.check_interval):
+            mtime = self._file_mtime()
+            if mtime is None or mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            try:
+                config = load(self.path)
+            except (OSError, ConfigError) as e:
+                self.rejected += 1
+                print(f"Config: rejected change ({e}); keeping the running configuration")
+                continue
+            with self._lock:
+                self._pending = config
+
+    def take(self):
+        """New validated configuration since the last call, or None"""
+        with self._lock:
+            config, self._pending = self._pending, None
+        return config
+
+    def commit(self, config):
+        """Record a configuration as applied"""
+        self.config = config
+        self.reloads += 1
+
+    def changes(self, config):
+        """Human-readable list of keys that differ from the running configuration"""
+        current = self.config or defaults()
+        return [f"{section}.{key}: {current[section][key]} → {value}"
+                for section, values in config.items() for key, value in values.items()
+                if current[section][key] != value]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a gesture config file or write the defaults")
+    parser.add_argument("path", nargs="?", default=DEFAULT_CONFIG_PATH)
+    parser.add_argument("--write-defaults", action="store_true", help="Overwrite path with the default config")
+    args = parser.parse_args()
+    if args.write_defaults:
+        write_defaults(args.path)
+        print(f"Wrote defaults to {args.path}")
+        return
+    try:
+        load(args.path)
+    except (OSError, ConfigError) as e:
+        print(f"Invalid: {e}")
+        sys.exit(1)
+    print(f"{args.path} is valid")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Gesture rules shared by the Android controller and the offline tools.
+
+Every helper takes MediaPipe-style landmarks (anything indexable by hand
+landmark id whose items have .x/.y attributes), so the same rules run on live
+``hands.process`` results and on replayed or recorded landmark data.
+"""
+import math
+from collections import namedtuple
+
+# MediaPipe hand landmark ids (same values as mp.solutions.hands.HandLandmark).
+# Kept local so offline tools can use the rules without importing mediapipe.
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+INDEX_FINGER_PIP = 6
+INDEX_FINGER_DIP = 7
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_MCP = 9
+MIDDLE_FINGER_DIP = 11
+MIDDLE_FINGER_TIP = 12
+RING_FINGER_DIP = 15
+RING_FINGER_TIP = 16
+PINKY_DIP = 19
+PINKY_TIP = 20
+
+NUM_LANDMARKS = 21
+
+# Plain landmark record for replayed or generated data (same fields as MediaPipe's)
+Landmark = namedtuple("Landmark", "x y z")
+
+# Static pose labels, in the order the controller checks them
+POSE_LABELS = ("ok", "heart", "scroll", "point")
+
+# Tunable distances of the pose rules (normalized image units); swapped as a whole
+# when the gesture configuration is reloaded
+Thresholds = namedtuple("Thresholds", "ok_max_distance heart_max_tips_distance heart_max_length_diff "
+                                      "cross_arms_overlap cross_arms_max_height_diff")
+DEFAULT_THRESHOLDS = Thresholds(ok_max_distance=0.05, heart_max_tips_distance=0.15, heart_max_length_diff=0.12,
+                                cross_arms_overlap=0.05, cross_arms_max_height_diff=0.25)
+
+
+def is_finger_folded(finger_tip, finger_dip):
+    """If fingertip is lower than middle joint → finger is folded"""
+    return finger_tip.y > finger_dip.y
+
+
+def finger_states(landmarks):
+    """Return the folded/extended state of each finger"""
+    return {
+        # Thumb: check horizontal (x) instead of vertical (y)
+        "thumb_folded": landmarks[THUMB_TIP].x < landmarks[THUMB_IP].x,
+        "index_extended": landmarks[INDEX_FINGER_TIP].y < landmarks[INDEX_FINGER_DIP].y,
+        "middle_extended": landmarks[MIDDLE_FINGER_TIP].y < landmarks[MIDDLE_FINGER_DIP].y,
+        "ring_folded": is_finger_folded(landmarks[RING_FINGER_TIP], landmarks[RING_FINGER_DIP]),
+        "pinky_folded": is_finger_folded(landmarks[PINKY_TIP], landmarks[PINKY_DIP]),
+    }
+
+
+def is_scroll_pose(states):
+    """Scroll pose: only index and middle fingers extended"""
+    return (states["index_extended"] and states["middle_extended"] and
+            states["ring_folded"] and states["pinky_folded"])
+
+
+def is_ok_gesture(landmarks, states, thresholds=DEFAULT_THRESHOLDS):
+    """OK gesture: thumb and index close together, other 3 fingers extended"""
+    thumb_tip = landmarks[THUMB_TIP]
+    index_tip = landmarks[INDEX_FINGER_TIP]
+    distance = ((thumb_tip.x - index_tip.x)**2 + (thumb_tip.y - index_tip.y)**2)**0.5
+    return (distance < thresholds.ok_max_distance and
+            states["middle_extended"] and
+            not states["ring_folded"] and
+            not states["pinky_folded"])
+
+
+def classify_angle_deg(angle_deg):
+    """Map an angle (deg, y axis downward) to a coarse direction label"""
+    if abs(angle_deg) <= 25:
+        return "right"
+    if abs(abs(angle_deg) - 180) <= 25:
+        return "left"
+    if -115 <= angle_deg <= -65:
+        return "up"
+    if 65 <= angle_deg <= 115:
+        return "down"
+    return "diagonal"
+
+
+def heart_gesture_checks(landmarks, states, thresholds=DEFAULT_THRESHOLDS):
+    """Evaluate the right-hand cross ("heart") gesture used to like a video.
+
+    Returns a dict with every intermediate check (used for overlays and debug
+    logs) and the combined result under "heart":
+    - 3 fingers (middle/ring/pinky) folded
+    - Thumb roughly horizontal (tip-ip x distance large, y distance small)
+    - Index extended
+    - Thumb-Index tips very close together (crossing contact)
+    - Index tip is above thumb tip (index over thumb)
+    - Wrist->index and wrist->thumb lengths similar (overlap region)
+    """
+    thumb_tip = landmarks[THUMB_TIP]
+    thumb_ip = landmarks[THUMB_IP]
+    index_tip = landmarks[INDEX_FINGER_TIP]
+    wrist_pt = landmarks[WRIST]
+
+    # Thumb direction angle using TIP - IP; must be between -60 and -10 degrees
+    thumb_dir_angle = math.degrees(math.atan2(thumb_tip.y - thumb_ip.y, thumb_tip.x - thumb_ip.x))
+    thumb_angle_ok = (-60 <= thumb_dir_angle <= -10)
+
+    # Thumb horizontal to either side
+    thumb_horizontal = (abs(thumb_tip.y - thumb_ip.y) < 0.07 and abs(thumb_tip.x - thumb_ip.x) > 0.03)
+    three_folded = (not states["middle_extended"] and states["ring_folded"] and states["pinky_folded"])
+
+    # Angle between vectors wrist->index and wrist->thumb
+    v_ix = index_tip.x - wrist_pt.x
+    v_iy = index_tip.y - wrist_pt.y
+    v_tx = thumb_tip.x - wrist_pt.x
+    v_ty = thumb_tip.y - wrist_pt.y
+    norm_i = math.hypot(v_ix, v_iy)
+    norm_t = math.hypot(v_tx, v_ty)
+    angle_ok = False
+    angle_deg = None
+    if norm_i > 1e-6 and norm_t > 1e-6:
+        cosang = max(-1.0, min(1.0, (v_ix * v_tx + v_iy * v_ty) / (norm_i * norm_t)))
+        angle_deg = math.degrees(math.acos(cosang))
+        # Angle not strictly required for crossing; allow wide range
+        angle_ok = 15 <= angle_deg <= 100
+
+    # Distance between tips should be very small (crossing contact)
+    tips_dist = math.hypot(thumb_tip.x - index_tip.x, thumb_tip.y - index_tip.y)
+    dist_ok = tips_dist < thresholds.heart_max_tips_distance
+
+    # Index above thumb (visual crossing with index on top)
+    index_above_thumb = index_tip.y < (thumb_tip.y - 0.005)
+
+    # Similar reach length from wrist to tips (so they overlap spatially)
+    length_similar = abs(norm_i - norm_t) < thresholds.heart_max_length_diff
+
+    heart = (
+        states["index_extended"] and three_folded and thumb_horizontal and thumb_angle_ok and
+        dist_ok and index_above_thumb and length_similar and angle_ok
+    )
+    return {
+        "heart": heart,
+        "three_folded": three_folded,
+        "thumb_dir_angle": thumb_dir_angle,
+        "thumb_angle_ok": thumb_angle_ok,
+        "thumb_horizontal": thumb_horizontal,
+        "tips_dist": tips_dist,
+        "dist_ok": dist_ok,
+        "index_above_thumb": index_above_thumb,
+        "norm_i": norm_i,
+        "norm_t": norm_t,
+        "length_similar": length_similar,
+        "angle_deg": angle_deg,
+        "angle_ok": angle_ok,
+    }
+
+
+def is_cross_arms(left_landmarks, right_landmarks, thresholds=DEFAULT_THRESHOLDS):
+    """Cross arms X gesture: both index fingers extended, hands crossed, similar height"""
+    left_wrist = left_landmarks[WRIST]
+    right_wrist = right_landmarks[WRIST]
+
+    left_index_extended = left_landmarks[INDEX_FINGER_TIP].y < left_landmarks[INDEX_FINGER_DIP].y
+    right_index_extended = right_landmarks[INDEX_FINGER_TIP].y < right_landmarks[INDEX_FINGER_DIP].y
+
+    # Left wrist is to the right of right wrist - allow some overlap
+    hands_crossed = left_wrist.x > (right_wrist.x - thresholds.cross_arms_overlap)
+    hands_similar_height = abs(left_wrist.y - right_wrist.y) < thresholds.cross_arms_max_height_diff
+
+    return (left_index_extended and right_index_extended and
+            hands_crossed and hands_similar_height)
+
+
+def classify_pose(landmarks, states=None, thresholds=DEFAULT_THRESHOLDS):
+    """Return the static pose label of a right hand ("ok", "heart", "scroll", "point") or None"""
+    if states is None:
+        states = finger_states(landmarks)
+    if is_ok_gesture(landmarks, states, thresholds):
+        return "ok"
+    if heart_gesture_checks(landmarks, states, thresholds)["heart"]:
+        return "heart"
+    if is_scroll_pose(states):
+        return "scroll"
+    if (states["index_extended"] and not states["middle_extended"] and
+            states["ring_folded"] and states["pinky_folded"]):
+        return "point"
+    return None
+
+
+class ScrollTracker:
+    """Turn wrist movement while in scroll pose into scroll actions.
+
+    Vertical movement is measured from where the pose started and must be held
+    long enough; horizontal swipes use the immediate frame-to-frame delta.
+    """
+
+    def __init__(self, threshold=0.02, time_threshold=0.2,
+                 swipe_right=0.02, swipe_left=-0.05,
+                 up_action="scroll_down", down_action="scroll_up",
+                 right_action="scroll_down", left_action="scroll_up"):
+        self.threshold = threshold
+        self.time_threshold = time_threshold
+        self.swipe_right = swipe_right  # None disables the swipe
+        self.swipe_left = swipe_left
+        self.up_action = up_action
+        self.down_action = down_action
+        self.right_action = right_action
+        self.left_action = left_action
+        self.start_y = None  # Initial Y position when gesture starts
+        self.start_time = None  # Initial time when gesture starts
+        self.prev_x = None
+
+    def reset(self):
+        """Forget the current gesture (keeps the last wrist position)"""
+        self.start_y = None
+        self.start_time = None
+
+    def update(self, x, y, now, active=True):
+        """Feed one wrist position; return the triggered action or None"""
+        action = None
+        if active:
+            if self.start_y is None:
+                # Gesture just started, save initial position and time
+                self.start_y = y
+                self.start_time = now
+            else:
+                delta_y = y - self.start_y
+                # Only recognize gesture after moving far enough and long enough
+                if abs(delta_y) > self.threshold and (now - self.start_time) > self.time_threshold:
+                    action = self.up_action if delta_y < 0 else self.down_action
+
+            # Check horizontal swipe (still use immediate delta)
+            if self.prev_x is not None:
+                delta_x = x - self.prev_x
+                if self.swipe_right is not None and delta_x > self.swipe_right:
+                    action = self.right_action
+                elif self.swipe_left is not None and delta_x < self.swipe_left:
+                    action = self.left_action
+        else:
+            self.reset()
+
+        self.prev_x = x
+        return action
+
+
+class GestureEventDetector:
+    """Edge-triggered gesture events as the Android controller sees them (no cooldown, no actuation)"""
+
+    def __init__(self, scroll_tracker=None, thresholds=DEFAULT_THRESHOLDS):
+        self.scroll_tracker = scroll_tracker if scroll_tracker is not None else ScrollTracker()
+        self.thresholds = thresholds
+        self.last_pose = None
+        self.last_scroll_action = None
+        self.last_cross_arms = False
+
+    def update(self, hands, now, poses=None):
+        """hands: list of (handedness, landmarks); return the list of new events.
+
+        poses optionally gives the static pose of every hand (e.g. from a
+        learned classifier) instead of the hand-coded rules.
+        """
+        events = []
+        left = next((lm for label, lm in hands if label == "Left"), None)
+        right_idx = next((idx for idx, (label, _) in enumerate(hands) if label == "Right"), None)
+        right = hands[right_idx][1] if right_idx is not None else None
+
+        cross_arms = bool(left is not None and right is not None and is_cross_arms(left, right, self.thresholds))
+        if cross_arms and not self.last_cross_arms:
+            events.append("cross_arms")
+        self.last_cross_arms = cross_arms
+
+        if right is None:
+            self.last_pose = None
+            return events
+
+        states = finger_states(right)
+        if poses is not None:
+            pose = poses[right_idx]
+            scroll_pose = pose == "scroll"
+        else:
+            pose = classify_pose(right, states, self.thresholds)
+            scroll_pose = is_scroll_pose(states)
+        if pose in ("ok", "heart") and pose != self.last_pose:
+            events.append(pose)
+        self.last_pose = pose
+
+        wrist = right[WRIST]
+        action = self.scroll_tracker.update(wrist.x, wrist.y, now, active=scroll_pose)
+        if action and action != self.last_scroll_action:
+            events.append(action)
+            # Measure the next scroll from here so continued movement scrolls again
+            self.scroll_tracker.reset()
+        self.last_scroll_action = action
+        return events
@@ -0,0 +1,132 @@
+"""Hand inference backends with the legacy ``hands.process`` interface.
+
+- "legacy": mp.solutions.hands.Hands (synchronous, blocks for every frame)
+- "tasks": MediaPipe Tasks HandLandmarker in LIVE_STREAM mode. Frames are
+  submitted with monotonic timestamps and results arrive via callback, so
+  capture and inference overlap; process() returns the newest finished result
+  (usually from the previous frame) instead of waiting.
+- "tasks_video": HandLandmarker in VIDEO mode (synchronous, timestamped)
+
+Tasks results are converted to the legacy shape (``multi_hand_landmarks`` /
+``multi_handedness`` protobufs), so gesture code and mp_drawing keep working
+unchanged. The Tasks backends need the hand_landmarker.task model file.
+"""
+import threading
+import time
+from collections import namedtuple
+
+import mediapipe as mp
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+
+DEFAULT_TASK_MODEL = "hand_landmarker.task"
+
+# Same attributes as the legacy solution's result (None when no hands)
+HandsResult = namedtuple("HandsResult", "multi_hand_landmarks multi_handedness")
+EMPTY_RESULT = HandsResult(None, None)
+
+
+class LegacyHandsBackend:
+    """mp.solutions.hands.Hands"""
+
+    name = "legacy"
+
+    def __init__(self, max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.7):
+        self.hands = mp.solutions.hands.Hands(max_num_hands=max_num_hands,
+                                              min_detection_confidence=min_detection_confidence,
+                                              min_tracking_confidence=min_tracking_confidence)
+
+    def process(self, rgb_frame):
+        return self.hands.process(rgb_frame)
+
+    def close(self):
+        self.hands.close()
+
+
+class TasksHandsBackend:
+    """MediaPipe Tasks HandLandmarker (LIVE_STREAM or VIDEO running mode)"""
+
+    def __init__(self, model_path=DEFAULT_TASK_MODEL, live_stream=True, max_num_hands=2,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.7, swap_handedness=False):
+        vision = mp.tasks.vision
+        self.name = "tasks" if live_stream else "tasks_video"
+        self.live_stream = live_stream
+        # Flip Left/Right if the model's labels come out mirrored relative to the legacy solution
+        self.swap_handedness = swap_handedness
+        self._latest = EMPTY_RESULT
+        self._latest_timestamp = None  # Timestamp (ms) of the frame behind self._latest
+        self._last_timestamp = -1
+        self._lock = threading.Lock()
+        options = vision.HandLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM if live_stream else vision.RunningMode.VIDEO,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result if live_stream else None,
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def _next_timestamp(self):
+        # Tasks require strictly increasing timestamps
+        timestamp = max(int(time.monotonic() * 1000), self._last_timestamp + 1)
+        self._last_timestamp = timestamp
+        return timestamp
+
+    def _convert(self, result):
+        if not result.hand_landmarks:
+            return HandsResult(None, None)
+        multi_hand_landmarks = []
+        multi_handedness = []
+        for hand_landmarks, handedness in zip(result.hand_landmarks, result.handedness):
+            landmark_list = landmark_pb2.NormalizedLandmarkList()
+            for lm in hand_landmarks:
+                landmark_list.landmark.add(x=lm.x, y=lm.y, z=lm.z)
+            multi_hand_landmarks.append(landmark_list)
+
+            category = handedness[0]
+            label = category.category_name
+            if self.swap_handedness:
+                label = {"Left": "Right", "Right": "Left"}.get(label, label)
+            classification_list = classification_pb2.ClassificationList()
+            classification_list.classification.add(index=category.index, score=category.score, label=label)
+            multi_handedness.append(classification_list)
+        return HandsResult(multi_hand_landmarks, multi_handedness)
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        converted = self._convert(result)
+        with self._lock:
+            self._latest = converted
+            self._latest_timestamp = timestamp_ms
+
+    def process(self, rgb_frame):
+        """Submit a frame; return the newest available result in legacy shape"""
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        timestamp = self._next_timestamp()
+        if not self.live_stream:
+            return self._convert(self.landmarker.detect_for_video(image, timestamp))
+        self.landmarker.detect_async(image, timestamp)
+        with self._lock:
+            return self._latest
+
+    def latest(self):
+        """Newest finished result without submitting a frame"""
+        with self._lock:
+            return self._latest
+
+    def latest_timestamp(self):
+        """Timestamp (ms, time.monotonic based) of the frame behind the newest result"""
+        with self._lock:
+            return self._latest_timestamp
+
+    def close(self):
+        self.landmarker.close()
+
+
+def create_hands_backend(backend="legacy", model_path=DEFAULT_TASK_MODEL, **kwargs):
+    """Build an inference backend by name ("legacy", "tasks" or "tasks_video")"""
+    if backend == "legacy":
+        return LegacyHandsBackend(**kwargs)
+    if backend in ("tasks", "tasks_video"):
+        return TasksHandsBackend(model_path=model_path, live_stream=backend == "tasks", **kwargs)
+    raise ValueError(f"Unknown inference backend: {backend}")
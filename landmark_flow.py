@@ -0,0 +1,154 @@
+"""Optical-flow landmark propagation between keyframe inferences.
+
+FlowTrackedHands runs the wrapped inference backend only on keyframes and
+moves the 21 landmarks of every hand on the frames in between with sparse
+pyramidal Lucas-Kanade optical flow (cv2.calcOpticalFlowPyrLK) on a
+downscaled grayscale image. Results keep the legacy shape
+(multi_hand_landmarks / multi_handedness), so gesture rules get full-rate
+landmark updates at a fraction of the inference cost.
+
+- Keyframe interval adapts to motion: the faster the hand moves, the sooner
+  the next keyframe (between min_interval and max_interval frames)
+- Each point is checked forward-backward; when too few points of a hand
+  track reliably, an early keyframe runs on the current frame
+- z and handedness are carried over from the last keyframe
+- A change of frame size forces a keyframe (points cannot be carried over)
+
+Keyframe landmarks must belong to the keyframe itself, so the backend has
+to be synchronous ("legacy" or "tasks_video"); the "tasks" live stream
+returns a result from an earlier frame and is refused.
+"""
+import cv2
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from inference_backends import HandsResult
+
+LK_PARAMS = dict(winSize=(15, 15), maxLevel=2,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+
+
+class FlowTrackedHands:
+    """Keyframe inference + Lucas-Kanade landmark tracking in between"""
+
+    def __init__(self, backend, scale=0.5, min_interval=1, max_interval=6, motion_budget=0.04,
+                 fb_threshold=1.0, min_tracked_fraction=0.7):
+        if getattr(backend, "live_stream", False):
+            raise ValueError("Optical-flow tracking needs a synchronous inference backend "
+                             "(\"legacy\" or \"tasks_video\"), not the \"tasks\" live stream")
+        self.backend = backend
+        self.scale = scale  # Optical flow runs on a grayscale image downscaled by this factor
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        # Normalized landmark movement allowed between keyframes; sets the adaptive interval
+        self.motion_budget = motion_budget
+        self.fb_threshold = fb_threshold  # Max forward-backward error (downscaled pixels) of a good point
+        self.min_tracked_fraction = min_tracked_fraction  # Below this share of good points → early keyframe
+        self.interval = max_interval
+        self._since_keyframe = 0
+        self._prev_gray = None
+        self._points = None  # (hands * 21, 1, 2) float32, downscaled pixel coordinates
+        self._z = None
+        self._handedness = None
+        self.result = None
+        self.keyframes = 0
+        self.early_keyframes = 0
+        self.tracked = 0
+
+    def _gray(self, frame, code):
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, code)
+
+    def _keyframe(self, frame_bgr, gray, rgb_frame):
+        if rgb_frame is None:
+            rgb_frame = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+        self.result = self.backend.process(rgb_frame)
+        self.keyframes += 1
+        self._since_keyframe = 0
+        self._prev_gray = gray
+        hands = self.result.multi_hand_landmarks or []
+        if not hands:
+            self._points = None
+            self.interval = self.max_interval
+            return self.result
+        height, width = gray.shape
+        coords = np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in hands], dtype=np.float32)
+        self._points = (coords[:, :, :2] * (width, height)).reshape(-1, 1, 2).astype(np.float32)
+        self._z = coords[:, :, 2]
+        self._handedness = self.result.multi_handedness
+        return self.result
+
+    def _track(self, gray):
+        """Propagate the points to gray; return the new result or None when tracking degraded"""
+        prev_points = self._points
+        points, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, prev_points, None, **LK_PARAMS)
+        if points is None:
+            return None
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, points, None, **LK_PARAMS)
+        fb_error = np.linalg.norm((back - prev_points).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < self.fb_threshold)
+
+        height, width = gray.shape
+        hand_count = len(prev_points) // 21
+        moved = points.reshape(hand_count, 21, 2)
+        previous = prev_points.reshape(hand_count, 21, 2)
+        good = good.reshape(hand_count, 21)
+        speeds = []
+        for hand in range(hand_count):
+            if good[hand].mean() < self.min_tracked_fraction:
+                return None
+            # Lost points follow the hand's median motion
+            shift = np.median(moved[hand][good[hand]] - previous[hand][good[hand]], axis=0)
+            moved[hand][~good[hand]] = previous[hand][~good[hand]] + shift
+            speeds.append(float(np.linalg.norm(shift / (width, height))))
+
+        self._points = moved.reshape(-1, 1, 2).astype(np.float32)
+        self._prev_gray = gray
+        # Faster motion → shorter keyframe interval
+        speed = max(speeds)
+        if speed > 0:
+            self.interval = int(max(self.min_interval, min(self.max_interval, self.motion_budget / speed)))
+        else:
+            self.interval = self.max_interval
+
+        normalized = moved / (width, height)
+        multi_hand_landmarks = []
+        for hand in range(hand_count):
+            landmark_list = landmark_pb2.NormalizedLandmarkList()
+            for (x, y), z in zip(normalized[hand].tolist(), self._z[hand].tolist()):
+                landmark_list.landmark.add(x=x, y=y, z=z)
+            multi_hand_landmarks.append(landmark_list)
+        return HandsResult(multi_hand_landmarks, self._handedness)
+
+    def process_bgr(self, frame_bgr, now=None, rgb_frame=None):
+        """Keyframe inference or tracked landmarks for a BGR frame"""
+        return self._process(self._gray(frame_bgr, cv2.COLOR_BGR2GRAY), frame_bgr, rgb_frame)
+
+    def process(self, rgb_frame):
+        """Legacy interface (RGB input)"""
+        return self._process(self._gray(rgb_frame, cv2.COLOR_RGB2GRAY), None, rgb_frame)
+
+    def _process(self, gray, frame_bgr, rgb_frame):
+        self._since_keyframe += 1
+        if (self._prev_gray is None or self._since_keyframe >= self.interval or
+                gray.shape != self._prev_gray.shape):
+            # A resized frame also needs a keyframe: the tracked points and previous image no longer fit
+            return self._keyframe(frame_bgr, gray, rgb_frame)
+        if self._points is None:
+            # No hands at the last keyframe: nothing to track until the next one
+            self._prev_gray = gray
+            return self.result
+        result = self._track(gray)
+        if result is None:
+            self.early_keyframes += 1
+            return self._keyframe(frame_bgr, gray, rgb_frame)
+        self.tracked += 1
+        self.result = result
+        return result
+
+    def stats(self):
+        return (f"{self.keyframes} keyframes ({self.early_keyframes} early), "
+                f"{self.tracked} frames tracked with optical flow")
+
+    def close(self):
+        self.backend.close()
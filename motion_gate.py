@@ -0,0 +1,103 @@
+"""Motion-gated hand inference.
+
+MotionGate compares a heavily downscaled grayscale copy of each frame with
+the one from the last inference; GatedHands only runs color conversion and
+hands.process when enough pixels changed, and otherwise returns the previous
+result together with its age. A full inference is forced every max_age
+seconds so slow movements that never cross the threshold between two
+frames are still picked up. A hand held still (e.g. in scroll pose) also
+counts as a static scene. With an asynchronous backend (the "tasks" live
+stream, see inference_backends.py) a skipped frame returns the backend's
+newest finished result instead, so a result still in flight when the scene
+went static is not held back until the next inference.
+"""
+import time
+
+import cv2
+
+
+class MotionGate:
+    """Frame differencing on a tiny grayscale image"""
+
+    def __init__(self, size=(64, 48), pixel_threshold=12, changed_fraction=0.002, max_age=0.5):
+        self.size = size  # Downscaled (width, height) compared between frames
+        self.pixel_threshold = pixel_threshold  # Gray-level difference for a pixel to count as changed
+        self.changed_fraction = changed_fraction  # Share of changed pixels that counts as motion
+        self.max_age = max_age  # Seconds after which inference is forced regardless of motion
+        self._reference = None
+        self._reference_time = None
+        self.last_changed = 0.0  # Share of changed pixels in the last comparison
+
+    def check(self, frame_bgr, now=None):
+        """Return True if the frame needs inference; the caller then runs it on this frame"""
+        now = time.time() if now is None else now
+        small = cv2.resize(frame_bgr, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        if self._reference is None or now - self._reference_time >= self.max_age:
+            self.last_changed = 1.0
+        else:
+            diff = cv2.absdiff(gray, self._reference)
+            changed = cv2.countNonZero(cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)[1])
+            self.last_changed = changed / float(gray.size)
+            if self.last_changed < self.changed_fraction:
+                return False
+        # Compare later frames with the one inference ran on, so slow drift adds up
+        self._reference = gray
+        self._reference_time = now
+        return True
+
+    def reset(self):
+        self._reference = None
+
+
+class GatedHands:
+    """Wraps an inference backend; process_bgr() skips inference on static frames"""
+
+    def __init__(self, backend, gate=None, enabled=True):
+        self.backend = backend
+        self.gate = gate if gate is not None else MotionGate()
+        self.enabled = enabled
+        self.result = None
+        self.result_time = None
+        self.inferred = 0
+        self.skipped = 0
+
+    def process_bgr(self, frame_bgr, now=None, rgb_frame=None):
+        """Result for a BGR frame (fresh or reused); see result_age().
+
+        Pass rgb_frame when an RGB copy already exists to skip the conversion.
+        """
+        now = time.time() if now is None else now
+        if not self.enabled or self.gate.check(frame_bgr, now):
+            if hasattr(self.backend, "process_bgr"):
+                # e.g. FlowTrackedHands, which needs the BGR frame itself
+                self.result = self.backend.process_bgr(frame_bgr, now, rgb_frame)
+            else:
+                if rgb_frame is None:
+                    rgb_frame = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+                self.result = self.backend.process(rgb_frame)
+            self.result_time = now
+            self.inferred += 1
+        else:
+            if hasattr(self.backend, "latest") and getattr(self.backend, "live_stream", False):
+                # Async backend: pick up results that finished since the last submission
+                latest = self.backend.latest()
+                if latest is not self.result:
+                    # A newly adopted result restarts the age / reuse window
+                    self.result = latest
+                    self.result_time = now
+            self.skipped += 1
+        return self.result
+
+    def result_age(self, now=None):
+        """Seconds since the returned result was inferred (0 when fresh)"""
+        if self.result_time is None:
+            return 0.0
+        return (time.time() if now is None else now) - self.result_time
+
+    def skip_ratio(self):
+        total = self.inferred + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,163 @@
+"""Learned static pose classifier (nearest centroid, pure NumPy).
+
+Alternative to the hand-tuned rules in gestures.py: every right hand in a
+frame is turned into a normalized landmark feature vector and all hands are
+classified against all pose centroids with a single matrix product.
+
+Models are trained from recorded sessions (the .npz files written by
+batch_annotate.py) and saved as small versioned .npz files.
+
+Usage:
+    # Bootstrap from the rule-based "pose" column of annotated sessions
+    python pose_classifier.py train annotations/*.npz -o pose_model.npz
+    # Or label whole recordings explicitly
+    python pose_classifier.py train heart=rec/heart.npz ok=rec/ok.npz none=rec/idle.npz -o pose_model.npz
+    python pose_classifier.py evaluate pose_model.npz annotations/*.npz
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+import gestures
+
+MODEL_FORMAT = 1
+FEATURE_NAME = "xy_wrist_mcp"
+NONE_LABEL = "none"
+
+
+def landmark_features(points):
+    """Normalize (N, 21, 2+) landmark arrays into (N, 42) feature vectors.
+
+    Coordinates are taken relative to the wrist and scaled by the
+    wrist -> middle finger MCP distance, so features do not depend on where
+    the hand is in the image or how far it is from the camera.
+    """
+    xy = np.asarray(points, dtype=np.float32)[..., :2]
+    xy = xy - xy[:, gestures.WRIST:gestures.WRIST + 1, :]
+    scale = np.linalg.norm(xy[:, gestures.MIDDLE_FINGER_MCP, :], axis=1)
+    xy = xy / np.maximum(scale, 1e-6)[:, None, None]
+    return xy.reshape(len(xy), -1)
+
+
+def landmarks_to_array(hand_landmarks_list):
+    """Convert MediaPipe hand landmark lists to an (N, 21, 2) array"""
+    return np.array([[(lm.x, lm.y) for lm in hand.landmark] for hand in hand_landmarks_list],
+                    dtype=np.float32).reshape(-1, gestures.NUM_LANDMARKS, 2)
+
+
+class PoseClassifier:
+    """Nearest-centroid classifier with a per-class rejection radius"""
+
+    def __init__(self, labels, centroids, radii, version=""):
+        self.labels = list(labels)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.radii = np.asarray(radii, dtype=np.float32)
+        self.version = version
+        # Precomputed for the ||x||^2 - 2 x.c + ||c||^2 distance expansion
+        self._centroid_sq = (self.centroids ** 2).sum(axis=1)
+
+    @classmethod
+    def train(cls, features, labels, radius_quantile=0.95, radius_margin=1.5):
+        """Fit one centroid per label; radius = margin * quantile of training distances"""
+        labels = np.asarray(labels)
+        names = sorted(set(labels.tolist()))
+        centroids = []
+        radii = []
+        for name in names:
+            members = features[labels == name]
+            centroid = members.mean(axis=0)
+            dists = np.linalg.norm(members - centroid, axis=1)
+            centroids.append(centroid)
+            radii.append(np.quantile(dists, radius_quantile) * radius_margin)
+        version = time.strftime("%Y%m%d-%H%M%S")
+        return cls(names, np.array(centroids), np.array(radii), version)
+
+    @classmethod
+    def load(cls, path):
+        """Load a model written by save()"""
+        with np.load(path) as data:
+            if int(data["format"]) != MODEL_FORMAT or str(data["feature"]) != FEATURE_NAME:
+                raise ValueError(f"Unsupported pose model {path}: format={data['format']} feature={data['feature']}")
+            return cls(data["labels"].tolist(), data["centroids"], data["radii"], str(data["version"]))
+
+    def save(self, path):
+        np.savez(path, format=np.int32(MODEL_FORMAT), feature=FEATURE_NAME, version=self.version,
+                 labels=np.array(self.labels), centroids=self.centroids, radii=self.radii)
+
+    def predict(self, features):
+        """Classify (N, D) features; returns a list of labels (None = no known pose)"""
+        if len(features) == 0:
+            return []
+        sq_dist = ((features ** 2).sum(axis=1)[:, None] - 2.0 * features @ self.centroids.T
+                   + self._centroid_sq[None, :])
+        best = sq_dist.argmin(axis=1)
+        best_dist = np.sqrt(np.maximum(sq_dist[np.arange(len(best)), best], 0.0))
+        poses = []
+        for idx, dist in zip(best.tolist(), best_dist.tolist()):
+            label = self.labels[idx]
+            poses.append(None if label == NONE_LABEL or dist > self.radii[idx] else label)
+        return poses
+
+    def classify_hands(self, hand_landmarks_list):
+        """Classify every hand of a MediaPipe result in one batched evaluation"""
+        return self.predict(landmark_features(landmarks_to_array(hand_landmarks_list)))
+
+
+def load_session(path, label=None):
+    """Return (features, labels) of the right hands in an annotated session"""
+    with np.load(path) as data:
+        right = data["handedness"] == "Right"
+        features = landmark_features(data["landmarks"][right])
+        if label is None:
+            labels = np.where(data["pose"][right] == "", NONE_LABEL, data["pose"][right])
+        else:
+            labels = np.full(len(features), label)
+    return features, labels
+
+
+def load_sessions(specs):
+    """Load "[label=]path" specs into stacked features and labels"""
+    all_features = []
+    all_labels = []
+    for spec in specs:
+        label, sep, path = spec.partition("=")
+        if not sep or os.path.exists(spec):
+            label, path = None, spec
+        features, labels = load_session(path, label)
+        all_features.append(features)
+        all_labels.append(labels)
+    return np.concatenate(all_features), np.concatenate(all_labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or evaluate the learned pose classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train_parser = sub.add_parser("train", help="Train a model from annotated sessions")
+    train_parser.add_argument("sessions", nargs="+", help="[label=]session.npz (label overrides the rule-based pose column)")
+    train_parser.add_argument("-o", "--output", default="pose_model.npz")
+    eval_parser = sub.add_parser("evaluate", help="Compare a model with the labels of annotated sessions")
+    eval_parser.add_argument("model")
+    eval_parser.add_argument("sessions", nargs="+")
+    args = parser.parse_args()
+
+    features, labels = load_sessions(args.sessions)
+    if args.command == "train":
+        model = PoseClassifier.train(features, labels)
+        model.save(args.output)
+        counts = {name: int((labels == name).sum()) for name in model.labels}
+        print(f"Saved pose model {model.version} to {args.output}: {counts}")
+    else:
+        model = PoseClassifier.load(args.model)
+        started = time.perf_counter()
+        predicted = model.predict(features)
+        elapsed = time.perf_counter() - started
+        expected = [None if label == NONE_LABEL else label for label in labels.tolist()]
+        correct = sum(p == e for p, e in zip(predicted, expected))
+        print(f"Model {model.version}: accuracy {correct / max(len(expected), 1):.3f} on {len(expected)} hands "
+              f"({elapsed * 1e6 / max(len(expected), 1):.2f} us/hand)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Preview display and runtime controls, decoupled from the processing loop.
+
+The processing loop only hands its annotated frame to PreviewDisplay.show()
+and rendering runs at a lower rate, so processing FPS depends little on
+display cost. Modes:
+
+- "window": cv2.imshow at `fps`, keys q / p / r become commands. HighGUI
+  stays on the thread that calls show() and stop() (the main loop), since
+  some platforms (macOS) only allow windows on the main thread; frames
+  between two renders cost nothing.
+- "mjpeg": JPEG encoding on a background thread, multipart stream on
+  http://127.0.0.1:<port>/ (no GUI needed)
+- "headless": no preview at all
+
+Commands ("quit", "profile", "record") arrive on a ControlCommands queue from
+the window keys, from signals (SIGINT / SIGTERM quit, SIGUSR1 toggles the
+profiler, SIGUSR2 toggles recording) and from an optional line-based control
+socket on localhost:
+    echo quit | nc 127.0.0.1 8765
+The socket also answers "status" with a JSON line of runtime metrics when
+a status callback is given (e.g. camera / device reconnect counts).
+"""
+import json
+import queue
+import signal
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+COMMANDS = ("quit", "profile", "record")
+WINDOW_KEYS = {ord('q'): "quit", ord('p'): "profile", ord('r'): "record"}
+
+
+class ControlCommands:
+    """Thread-safe queue of runtime commands for the processing loop"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def put(self, command):
+        self._queue.put(command)
+
+    def drain(self):
+        """All pending commands, without blocking"""
+        commands = []
+        while True:
+            try:
+                commands.append(self._queue.get_nowait())
+            except queue.Empty:
+                return commands
+
+    def install_signal_handlers(self):
+        """SIGINT / SIGTERM request a clean quit; SIGUSR1 toggles the profiler, SIGUSR2 recording"""
+        signal.signal(signal.SIGINT, lambda *_: self.put("quit"))
+        if hasattr(signal, "SIGTERM"):
+            signal.signal(signal.SIGTERM, lambda *_: self.put("quit"))
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda *_: self.put("profile"))
+        if hasattr(signal, "SIGUSR2"):
+            signal.signal(signal.SIGUSR2, lambda *_: self.put("record"))
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class ControlServer:
+    """Line-based control socket on localhost: one command per line, replies "ok" or "unknown" """
+
+    def __init__(self, commands, port=8765, host="127.0.0.1", status=None):
+        channel = commands
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    command = line.decode("utf-8", "replace").strip().lower()
+                    if not command:
+                        continue
+                    if command in COMMANDS:
+                        channel.put(command)
+                        self.wfile.write(b"ok\n")
+                    elif command == "status" and status is not None:
+                        self.wfile.write(json.dumps(status()).encode() + b"\n")
+                    else:
+                        self.wfile.write(b"unknown\n")
+
+        self.server = _ThreadingTCPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="control-socket", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        print(f"Control socket on {host}:{port} (commands: {', '.join(COMMANDS)})")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class PreviewDisplay:
+    """Renders the newest frame at `fps` (window: in show(), mjpeg: on a background thread)"""
+
+    def __init__(self, window_name, mode="window", fps=15.0, commands=None,
+                 mjpeg_port=8080, mjpeg_host="127.0.0.1", jpeg_quality=70):
+        if mode not in ("window", "mjpeg", "headless"):
+            raise ValueError(f"Unknown preview mode: {mode}")
+        self.window_name = window_name
+        self.mode = mode
+        self.fps = fps
+        self.commands = commands if commands is not None else ControlCommands()
+        self.mjpeg_port = mjpeg_port
+        self.mjpeg_host = mjpeg_host
+        self.jpeg_quality = jpeg_quality
+        self._frame = None
+        self._frame_id = 0
+        self._lock = threading.Lock()
+        self._jpeg_ready = threading.Condition()
+        self._jpeg = None
+        self._jpeg_id = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._server = None
+        self._next_render = 0.0
+        self.rendered = 0
+
+    def start(self):
+        if self.mode == "headless":
+            print("Preview disabled (headless)")
+            return
+        if self.mode == "window":
+            # Rendered from show() on the caller's thread (HighGUI must stay on the main thread)
+            return
+        self._start_mjpeg_server()
+        self._thread = threading.Thread(target=self._run, name="preview", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        with self._jpeg_ready:
+            self._jpeg_ready.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self.mode == "window" and self.rendered:
+            cv2.destroyWindow(self.window_name)
+
+    def show(self, frame):
+        """Offer the newest annotated frame; never blocks on rendering.
+
+        The frame must not be modified afterwards (the loops allocate a new one per capture).
+        """
+        if self.mode == "headless":
+            return
+        if self.mode == "window":
+            self._render_window(frame)
+            return
+        with self._lock:
+            self._frame = frame
+            self._frame_id += 1
+
+    def _render_window(self, frame):
+        now = time.perf_counter()
+        if now < self._next_render:
+            return
+        self._next_render = max(self._next_render + 1.0 / self.fps, now)
+        cv2.imshow(self.window_name, frame)
+        self.rendered += 1
+        # waitKey also pumps the GUI events
+        key = cv2.waitKey(1) & 0xFF
+        if key in WINDOW_KEYS:
+            self.commands.put(WINDOW_KEYS[key])
+
+    def _latest(self, last_id):
+        with self._lock:
+            if self._frame_id == last_id:
+                return None, last_id
+            return self._frame, self._frame_id
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        last_id = 0
+        next_time = time.perf_counter()
+        while not self._stop_event.is_set():
+            frame, last_id = self._latest(last_id)
+            if frame is not None:
+                ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                if ok:
+                    with self._jpeg_ready:
+                        self._jpeg = encoded.tobytes()
+                        self._jpeg_id += 1
+                        self._jpeg_ready.notify_all()
+                self.rendered += 1
+
+            self._stop_event.wait(max(0.0, next_time + interval - time.perf_counter()))
+            next_time = max(next_time + interval, time.perf_counter() - interval)
+
+    def _start_mjpeg_server(self):
+        preview = self
+
+        class StreamHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+                self.end_headers()
+                last_id = 0
+                try:
+                    while not preview._stop_event.is_set():
+                        with preview._jpeg_ready:
+                            preview._jpeg_ready.wait_for(
+                                lambda: preview._jpeg_id != last_id or preview._stop_event.is_set(), timeout=1.0)
+                            jpeg, last_id = preview._jpeg, preview._jpeg_id
+                        if jpeg is None:
+                            continue
+                        self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n")
+                        self.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                        self.wfile.write(jpeg)
+                        self.wfile.write(b"\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.mjpeg_host, self.mjpeg_port), StreamHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="mjpeg-server", daemon=True).start()
+        print(f"Preview stream on http://{self.mjpeg_host}:{self.mjpeg_port}/ at {self.fps:.0f} fps")
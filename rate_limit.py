@@ -0,0 +1,154 @@
+"""Per-action rate limiting for gesture-triggered actions.
+
+Replaces the single global action_cooldown: every (action, target) pair gets
+its own token bucket, so a like no longer blocks scrolling and scrolls can
+run at the device's real rate while like/open/close keep strict duplicate
+protection. Edge-triggered gestures can also be debounced: a new edge of the
+same gesture within the debounce window (pose flicker) is ignored.
+Suppressed actions are counted per action and reason.
+"""
+import time
+from collections import Counter
+
+
+class TokenBucket:
+    """rate tokens per second, at most burst tokens stored"""
+
+    def __init__(self, rate, burst=1, now=None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.time() if now is None else now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def ready(self, now):
+        self._refill(now)
+        return self.tokens >= 1.0
+
+    def take(self, now):
+        """Consume a token if one is available"""
+        if not self.ready(now):
+            return False
+        self.tokens -= 1.0
+        return True
+
+    def wait_time(self, now):
+        """Seconds until the next token is available"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    def reconfigure(self, rate, burst, now):
+        """Change rate and burst; tokens refilled so far are kept up to the new burst"""
+        self._refill(now)
+        self.rate = rate
+        self.burst = burst
+        self.tokens = min(self.tokens, float(burst))
+
+
+class ActionLimiter:
+    """Token buckets per (action, target) plus debounce for edge-triggered gestures.
+
+    limits: {action: (rate per second, burst)}; actions without an entry use
+    `default` (None = unlimited). debounce: {action: seconds}.
+    """
+
+    def __init__(self, limits, default=None, debounce=None):
+        self.limits = dict(limits)
+        self.default = default
+        self.debounce = dict(debounce or {})
+        self._buckets = {}
+        self._last_edge = {}
+        self.allowed = Counter()
+        self.suppressed = Counter()  # (action, "rate" / "debounce") → count
+
+    def _bucket(self, action, target, now):
+        key = (action, target)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit = self.limits.get(action, self.default)
+            if limit is None:
+                return None
+            bucket = self._buckets[key] = TokenBucket(*limit, now=now)
+        return bucket
+
+    def allow(self, action, target=None, now=None):
+        """Decide whether to execute an action now; records the outcome"""
+        now = time.time() if now is None else now
+        key = (action, target)
+        window = self.debounce.get(action)
+        if window is not None:
+            last_edge = self._last_edge.get(key)
+            # Every edge restarts the window, so a flickering pose stays suppressed
+            self._last_edge[key] = now
+            if last_edge is not None and now - last_edge < window:
+                self.suppressed[(action, "debounce")] += 1
+                return False
+        bucket = self._bucket(action, target, now)
+        if bucket is not None and not bucket.take(now):
+            self.suppressed[(action, "rate")] += 1
+            return False
+        self.allowed[action] += 1
+        return True
+
+    def ready(self, action, target=None, now=None):
+        """Would the rate limit allow the action now (does not consume or count)"""
+        now = time.time() if now is None else now
+        bucket = self._bucket(action, target, now)
+        return bucket is None or bucket.ready(now)
+
+    def wait_time(self, action, target=None, now=None):
+        now = time.time() if now is None else now
+        bucket = self._bucket(action, target, now)
+        return 0.0 if bucket is None else bucket.wait_time(now)
+
+    def reconfigure(self, other, now=None):
+        """Adopt another limiter's limits and debounce windows; keeps the metrics.
+
+        Existing buckets keep their tokens (clamped to the new burst), so a
+        reload does not hand out a fresh burst; buckets of actions that are
+        no longer limited are dropped.
+        """
+        now = time.time() if now is None else now
+        self.limits = dict(other.limits)
+        self.default = other.default
+        self.debounce = dict(other.debounce)
+        for key, bucket in list(self._buckets.items()):
+            limit = self.limits.get(key[0], self.default)
+            if limit is None:
+                del self._buckets[key]
+            else:
+                bucket.reconfigure(*limit, now=now)
+
+    def summary(self):
+        """One line per action: executed and suppressed counts"""
+        actions = sorted(set(self.allowed) | {action for action, _ in self.suppressed})
+        lines = []
+        for action in actions:
+            lines.append(f"{action}: {self.allowed[action]} executed, "
+                         f"{self.suppressed[(action, 'rate')]} rate-limited, "
+                         f"{self.suppressed[(action, 'debounce')]} debounced")
+        return "\n".join(lines)
+
+
+def android_limiter(scroll_rate=4.0, scroll_burst=2, like_rate=1.0, app_rate=0.5,
+                    like_debounce=0.5, app_debounce=1.0):
+    """Limits of the Android controller: fast scrolls, one like/open/close at a time.
+
+    scroll_rate is swipes per second per direction; raise it up to what the
+    device can actually execute (each swipe is a ~50 ms uiautomator2 call).
+    app_rate / app_debounce apply to opening and closing the app.
+    """
+    return ActionLimiter(
+        limits={
+            "scroll_down": (scroll_rate, scroll_burst),
+            "scroll_up": (scroll_rate, scroll_burst),
+            "like": (like_rate, 1),
+            "open": (app_rate, 1),
+            "close": (app_rate, 1),
+        },
+        debounce={"like": like_debounce, "open": app_debounce, "close": app_debounce},
+    )
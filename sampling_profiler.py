@@ -0,0 +1,78 @@
+"""On-demand sampling profiler for the control scripts.
+
+Samples the Python stacks of every thread (main loop and background workers)
+for a bounded duration and writes them in collapsed-stack format, one
+"thread;frame;frame;... count" line per unique stack, ready for
+flamegraph.pl, speedscope or inferno. Nothing runs while the profiler is off.
+The scripts toggle it from their main loop on the "profile" command (key p,
+SIGUSR1 or the control socket, see preview.py), never from a signal handler.
+"""
+import os
+import sys
+import threading
+import time
+
+
+class SamplingProfiler:
+    """Bounded-duration stack sampler toggled at runtime"""
+
+    def __init__(self, interval=0.005, duration=30.0, output_dir="profiles"):
+        self.interval = interval  # Seconds between samples
+        self.duration = duration  # A capture stops by itself after this many seconds
+        self.output_dir = output_dir
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        print(f"Profiler started ({self.duration:.0f}s max, every {self.interval * 1000:.0f}ms)")
+
+    def stop(self):
+        """Stop a running capture and wait for its file to be written"""
+        if self.running:
+            self._stop_event.set()
+            self._thread.join()
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def _run(self):
+        counts = {}
+        samples = 0
+        own_id = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + self.duration
+        while not self._stop_event.wait(self.interval) and time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                key = ";".join(reversed(stack))
+                counts[key] = counts.get(key, 0) + 1
+            samples += 1
+        self._write(counts, samples, time.perf_counter() - started)
+
+    def _write(self, counts, samples, elapsed):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+        with open(path, "w") as f:
+            for stack, count in sorted(counts.items()):
+                f.write(f"{stack} {count}\n")
+        print(f"Profiler stopped: {samples} samples in {elapsed:.1f}s written to {path}")
@@ -0,0 +1,148 @@
+"""Background recording of the annotated preview frames.
+
+The main loop hands frames to submit(), which only decimates and enqueues a
+copy; resizing and encoding with cv2.VideoWriter happen on a background
+thread. The queue is bounded: when encoding falls behind, new frames are
+dropped instead of blocking the loop. Files are rotated by size and by time:
+    recordings/session-<timestamp>.mp4
+"""
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+
+class SessionRecorder:
+    """Decimated, downscaled, non-blocking cv2.VideoWriter recorder"""
+
+    def __init__(self, output_dir="recordings", fps=10.0, scale=0.5, queue_size=8,
+                 max_megabytes=200, max_seconds=600, fourcc="mp4v", extension=".mp4"):
+        self.output_dir = output_dir
+        self.fps = fps  # Recorded frame rate (frames in between are skipped)
+        self.scale = scale  # Recorded resolution relative to the preview
+        self.max_bytes = max_megabytes * 1024 * 1024
+        self.max_seconds = max_seconds
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.extension = extension
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._last_submit = None
+        self.written = 0
+        self.dropped = 0
+        self.files = []
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._last_submit = None
+        # Fresh queue: nothing left over from a recording that ended early (e.g. a failed open)
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+        print(f"Recording to {self.output_dir}/ at {self.fps:.0f} fps, {self.scale:.0%} scale")
+
+    def stop(self):
+        """Flush queued frames, close the current file and wait for the thread"""
+        if not self.running:
+            return
+        # Never block on a full queue: make room by dropping the oldest pending frame
+        while True:
+            try:
+                self._queue.put_nowait(None)
+                break
+            except queue.Full:
+                self._drop_oldest()
+        self._thread.join()
+        print(f"Recording stopped: {self.written} frames in {len(self.files)} file(s), {self.dropped} dropped")
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def submit(self, frame, now=None):
+        """Offer an annotated frame; never blocks. Returns True if it was queued"""
+        if not self.running:
+            return False
+        now = time.time() if now is None else now
+        if self._last_submit is not None and now - self._last_submit < 1.0 / self.fps:
+            return False
+        self._last_submit = now
+        try:
+            self._queue.put_nowait(frame.copy())
+        except queue.Full:
+            # Encoder is behind: drop rather than stall the main loop
+            self.dropped += 1
+            return False
+        return True
+
+    def _drop_oldest(self):
+        try:
+            frame = self._queue.get_nowait()
+        except queue.Empty:
+            return
+        if frame is not None:
+            self.dropped += 1
+
+    def _drain(self):
+        """Discard every queued frame (counted as dropped)"""
+        while not self._queue.empty():
+            self._drop_oldest()
+
+    def _open(self, size):
+        base = os.path.join(self.output_dir, time.strftime("session-%Y%m%d-%H%M%S"))
+        path = base + self.extension
+        # Never overwrite a file (several rotations or restarts within one second)
+        suffix = 1
+        while os.path.exists(path):
+            path = f"{base}-{suffix}{self.extension}"
+            suffix += 1
+        writer = cv2.VideoWriter(path, self.fourcc, self.fps, size)
+        if not writer.isOpened():
+            print(f"Recorder: could not open {path}")
+            return None, path
+        self.files.append(path)
+        return writer, path
+
+    def _run(self):
+        writer = None
+        writer_size = None
+        path = None
+        opened_at = 0.0
+        try:
+            while True:
+                frame = self._queue.get()
+                if frame is None:
+                    break
+                if self.scale != 1.0:
+                    frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+                size = (frame.shape[1], frame.shape[0])
+
+                # Rotate by time, by size, or when the preview resolution changed
+                if writer is not None:
+                    too_old = time.time() - opened_at >= self.max_seconds
+                    too_big = self.written % 30 == 0 and os.path.getsize(path) >= self.max_bytes
+                    if too_old or too_big or size != writer_size:
+                        writer.release()
+                        writer = None
+                if writer is None:
+                    writer, path = self._open(size)
+                    if writer is None:
+                        # Frames queued for this recording must not end up in the next one
+                        self._drain()
+                        break
+                    writer_size = size
+                    opened_at = time.time()
+                writer.write(frame)
+                self.written += 1
+        finally:
+            if writer is not None:
+                writer.release()
@@ -0,0 +1,314 @@
+"""Multi-process Android controller pipeline over shared memory.
+
+Capture + preprocessing, MediaPipe inference and decision/actuation run in
+separate processes so none of them contend for the same GIL:
+
+    capture ──slot idx──▶ inference ──slot idx──▶ decision/actuation (main)
+       ▲                                                  │
+       └──────────────────── free slot idx ◀──────────────┘
+
+Frames live in a shared_memory ring of preallocated slots (BGR for display,
+RGB for inference) and landmarks in a compact float32 array indexed by the
+same slot, so only slot indices cross the process queues. When the ring is
+full the capture process drops frames instead of queueing them, and the
+decision stage always jumps to the newest result, so a slow device action
+delays at most one decision instead of building a backlog.
+
+Usage:
+    python shm_pipeline.py                 # controls the first ADB device
+    python shm_pipeline.py --fake-device   # dry run without a phone
+    python shm_pipeline.py --preview headless   # no window; quit with Ctrl+C or `echo quit | nc 127.0.0.1 8765`
+"""
+import argparse
+import multiprocessing
+import queue
+import signal
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import gestures
+
+MAX_HANDS = 2
+HANDEDNESS_CODES = {"Left": 1, "Right": 2}
+HANDEDNESS_LABELS = {1: "Left", 2: "Right"}
+
+
+class SharedRing:
+    """Shared-memory frame slots plus the per-slot landmark channel"""
+
+    def __init__(self, slots, width, height, name=None):
+        self.slots = slots
+        self.width = width
+        self.height = height
+        frame_shape = (slots, 2, height, width, 3)  # [slot][0=BGR, 1=RGB]
+        landmark_shape = (slots, MAX_HANDS, gestures.NUM_LANDMARKS, 3)
+        meta_shape = (slots, MAX_HANDS + 2)  # hand count, capture time, handedness codes
+        sizes = [int(np.prod(frame_shape)), int(np.prod(landmark_shape)) * 4, int(np.prod(meta_shape)) * 8]
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=sum(sizes))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        buf = self.shm.buf
+        self.frames = np.ndarray(frame_shape, dtype=np.uint8, buffer=buf)
+        self.landmarks = np.ndarray(landmark_shape, dtype=np.float32, buffer=buf, offset=sizes[0])
+        self.meta = np.ndarray(meta_shape, dtype=np.float64, buffer=buf, offset=sizes[0] + sizes[1])
+
+    def spec(self):
+        """Arguments to reattach to this ring from another process"""
+        return self.slots, self.width, self.height, self.shm.name
+
+    def hands(self, slot):
+        """Landmarks of a slot as a list of (handedness, landmarks)"""
+        count = int(self.meta[slot, 0])
+        result = []
+        for hand in range(count):
+            label = HANDEDNESS_LABELS.get(int(self.meta[slot, 2 + hand]), "Unknown")
+            result.append((label, [gestures.Landmark(*p) for p in self.landmarks[slot, hand].tolist()]))
+        return result
+
+    def close(self):
+        # Drop the numpy views before closing the mapping
+        del self.frames, self.landmarks, self.meta
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def capture_process(ring_spec, camera_index, free_slots, infer_slots, stop):
+    """Read, mirror and color-convert camera frames straight into free ring slots"""
+    import cv2
+
+    from supervisor import CameraSupervisor
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    ring = SharedRing(*ring_spec)
+    # Probed/cached profile; frames are resized below if it differs from the ring size.
+    # Failed reads reopen the camera in the background (see supervisor.py)
+    camera = CameraSupervisor(camera_index).open()
+    dropped = 0
+    try:
+        while not stop.is_set():
+            ret, frame = camera.read()
+            if not ret:
+                stop.wait(0.05)
+                continue
+            try:
+                slot = free_slots.get_nowait()
+            except queue.Empty:
+                # Ring full: drop this frame rather than add latency
+                dropped += 1
+                continue
+            if frame.shape[1] != ring.width or frame.shape[0] != ring.height:
+                frame = cv2.resize(frame, (ring.width, ring.height))
+            # Flip image for easier control
+            cv2.flip(frame, 1, dst=ring.frames[slot, 0])
+            cv2.cvtColor(ring.frames[slot, 0], cv2.COLOR_BGR2RGB, dst=ring.frames[slot, 1])
+            ring.meta[slot, 1] = time.time()
+            infer_slots.put(slot)
+    finally:
+        print(f"Capture: stopped ({dropped} frames dropped)")
+        print(camera.summary())
+        infer_slots.put(None)
+        camera.release()
+        ring.close()
+
+
+def inference_process(ring_spec, infer_slots, result_slots, motion_gating=True):
+    """Run MediaPipe Hands on ready slots and write landmarks back into the ring"""
+    from inference_backends import LegacyHandsBackend
+    from motion_gate import GatedHands
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    ring = SharedRing(*ring_spec)
+    # Static frames reuse the previous result (see motion_gate.py)
+    hands = GatedHands(LegacyHandsBackend(max_num_hands=MAX_HANDS, min_detection_confidence=0.7,
+                                          min_tracking_confidence=0.7), enabled=motion_gating)
+    try:
+        while True:
+            slot = infer_slots.get()
+            if slot is None:
+                break
+            result = hands.process_bgr(ring.frames[slot, 0], rgb_frame=ring.frames[slot, 1])
+            count = 0
+            for hand_idx, hand_landmarks in enumerate((result.multi_hand_landmarks or [])[:MAX_HANDS]):
+                label = "Unknown"
+                if result.multi_handedness and hand_idx < len(result.multi_handedness):
+                    label = result.multi_handedness[hand_idx].classification[0].label
+                ring.landmarks[slot, hand_idx] = [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+                ring.meta[slot, 2 + hand_idx] = HANDEDNESS_CODES.get(label, 0)
+                count += 1
+            ring.meta[slot, 0] = count
+            result_slots.put(slot)
+    finally:
+        result_slots.put(None)
+        print(f"Inference: ran on {hands.inferred} frames, skipped {hands.skipped} static frames")
+        hands.close()
+        ring.close()
+
+
+def draw_hands(frame, hands):
+    """Cheap landmark overlay (no protobuf needed)"""
+    import cv2
+
+    height, width = frame.shape[:2]
+    for label, landmarks in hands:
+        color = (0, 255, 0) if label == "Right" else (0, 0, 255)
+        for lm in landmarks:
+            cv2.circle(frame, (int(lm.x * width), int(lm.y * height)), 3, color, -1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Android controller as a shared-memory multi-process pipeline")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--slots", type=int, default=4, help="Frames in the shared ring")
+    parser.add_argument("--no-motion-gating", action="store_true", help="Run inference on every frame")
+    parser.add_argument("--fake-device", action="store_true", help="Use FakeDevice instead of u2.connect()")
+    parser.add_argument("--preview", default="window", choices=("window", "mjpeg", "headless"),
+                        help="Preview window, MJPEG stream on http://127.0.0.1:8080/, or none")
+    parser.add_argument("--preview-fps", type=float, default=15.0)
+    parser.add_argument("--control-port", type=int, default=8765,
+                        help="Localhost control socket for quit/profile/status (0 disables)")
+    args = parser.parse_args()
+
+    import cv2
+
+    import gesture_config
+    from app_state import ForegroundAppTracker
+    from controller import AndroidController
+    from preview import ControlCommands, ControlServer, PreviewDisplay
+    from sampling_profiler import SamplingProfiler
+    from supervisor import DeviceSupervisor
+
+    if args.fake_device:
+        from fake_device import FakeDevice
+        device_supervisor = DeviceSupervisor(FakeDevice)
+    else:
+        import uiautomator2 as u2
+        device_supervisor = DeviceSupervisor(u2.connect)
+    # Proxy to the current connection; a dropped link is reconnected in the background
+    device = device_supervisor.connect()
+    app_tracker = ForegroundAppTracker(device)
+    app_tracker.start()
+    device_supervisor.on_reconnect = app_tracker.invalidate
+    # Same decisions and settings as hand_detection_android.py (gesture_config.json, read once)
+    config = gesture_config.ConfigWatcher("gesture_config.json").load_initial()
+    controller = AndroidController.from_config(device, config, app_tracker=app_tracker)
+
+    ctx = multiprocessing.get_context("spawn")
+    ring = SharedRing(args.slots, args.width, args.height)
+    free_slots, infer_slots, result_slots = ctx.Queue(), ctx.Queue(), ctx.Queue()
+    for slot in range(args.slots):
+        free_slots.put(slot)
+    stop = ctx.Event()
+    workers = [
+        ctx.Process(target=capture_process, args=(ring.spec(), args.camera, free_slots, infer_slots, stop),
+                    name="capture", daemon=True),
+        ctx.Process(target=inference_process, args=(ring.spec(), infer_slots, result_slots, not args.no_motion_gating),
+                    name="inference", daemon=True),
+    ]
+    for worker in workers:
+        worker.start()
+
+    profiler = SamplingProfiler()
+    commands = ControlCommands()
+    commands.install_signal_handlers()
+    control_server = None
+    if args.control_port:
+        try:
+            control_server = ControlServer(commands, port=args.control_port,
+                                           status=lambda: {"device": device_supervisor.metrics()})
+            control_server.start()
+        except OSError as e:
+            # e.g. port in use by another instance; keys and signals still work
+            print(f"Control socket disabled, cannot listen on port {args.control_port}: {e}")
+    preview = PreviewDisplay("Hand Gesture Control - Pipeline", mode=args.preview, fps=args.preview_fps,
+                             commands=commands)
+    preview.start()
+
+    def handle_commands():
+        """Run pending runtime commands; True when quitting was requested"""
+        pending = commands.drain()
+        if "profile" in pending:
+            profiler.toggle()
+        return "quit" in pending
+
+    frames = 0
+    latency_sum = 0.0
+    started = time.time()
+    try:
+        while True:
+            try:
+                # Bounded wait: Ctrl+C only queues "quit", so keep answering commands without frames
+                slot = result_slots.get(timeout=0.2)
+            except queue.Empty:
+                if handle_commands():
+                    break
+                dead = [worker.name for worker in workers if not worker.is_alive()]
+                if dead:
+                    print(f"Pipeline: {', '.join(dead)} process exited, stopping")
+                    break
+                continue
+            if slot is None:
+                break
+            # Always act on the newest result; hand older slots straight back
+            while True:
+                try:
+                    newer = result_slots.get_nowait()
+                except queue.Empty:
+                    break
+                if newer is None:
+                    free_slots.put(slot)
+                    slot = None
+                    break
+                free_slots.put(slot)
+                slot = newer
+            if slot is None:
+                break
+
+            now = time.time()
+            hands = ring.hands(slot)
+            latency_sum += now - ring.meta[slot, 1]
+            frames += 1
+            for action in controller.step(hands, now):
+                print(f"Action: {action}")
+
+            if args.preview != "headless":
+                frame = ring.frames[slot, 0].copy()
+                draw_hands(frame, hands)
+                cv2.putText(frame, f"FPS: {frames / max(now - started, 1e-6):.1f}  "
+                                   f"Latency: {latency_sum / frames * 1000:.0f}ms",
+                            (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                preview.show(frame)
+            free_slots.put(slot)
+
+            if handle_commands():
+                break
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        profiler.stop()
+        preview.stop()
+        if control_server is not None:
+            control_server.stop()
+        app_tracker.stop()
+        device_supervisor.stop()
+        print("Actions:\n" + (controller.limiter.summary() or "none"))
+        print(device_supervisor.summary())
+        ring.close()
+        cv2.destroyAllWindows()
+        elapsed = time.time() - started
+        if frames:
+            print(f"Processed {frames} frames in {elapsed:.1f}s ({frames / elapsed:.1f} fps, "
+                  f"mean capture-to-decision latency {latency_sum / frames * 1000:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Long-running soak test of the Android controller logic.
+
+Replays recorded landmarks (a batch_annotate.py .npz) or a video file in a
+loop at accelerated speed through the controller's gesture decisions and a
+FakeDevice, and periodically records RSS, Python heap (tracemalloc), net
+allocated blocks per frame and thread count. The baseline is the first
+sample at or after the warm-up; exits with status 1 if growth after it
+exceeds the budget, or if the run ends before any sample could be compared
+with a baseline.
+
+The decisions are AndroidController's, the same code hand_detection_android.py
+runs, with a ForegroundAppTracker polling the FakeDevice on its background
+thread as in the script (in wall-clock time, --tracker-interval). With --render every frame also goes through the main loop's drawing
+work (draw_landmarks, finger state / status text, a fresh frame handed to an
+MJPEG PreviewDisplay that JPEG-encodes it), so per-frame allocations outside
+the controller are covered too; this needs cv2, numpy and mediapipe.
+
+Usage:
+    python soak_test.py --landmarks annotations/session.npz --hours 48
+    python soak_test.py --video footage/session.mp4 --hours 4 --csv soak.csv
+    python soak_test.py --landmarks annotations/session.npz --hours 4 --render
+"""
+import argparse
+import csv
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+import gestures
+from app_state import ForegroundAppTracker
+from controller import AndroidController
+from fake_device import FakeDevice
+
+
+def landmark_frames(path):
+    """Load a session .npz into a list of frames, each a list of (handedness, landmarks)"""
+    import numpy as np
+
+    with np.load(path) as data:
+        frame_ids = data["frame"]
+        handedness = data["handedness"].tolist()
+        points = data["landmarks"].tolist()
+    frames = [[] for _ in range(int(frame_ids.max()) + 1 if len(frame_ids) else 1)]
+    for frame_id, label, hand in zip(frame_ids.tolist(), handedness, points):
+        frames[frame_id].append((label, [gestures.Landmark(*p) for p in hand]))
+    return frames
+
+
+def replay_landmarks(path):
+    """Loop over recorded landmark frames forever"""
+    frames = landmark_frames(path)
+    print(f"Replaying {len(frames)} recorded frames from {path}")
+    while True:
+        yield from frames
+
+
+def replay_video(path):
+    """Loop over a video file forever, running MediaPipe Hands on every frame"""
+    import cv2
+    import mediapipe as mp
+
+    hands = mp.solutions.hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    print(f"Replaying {path} through MediaPipe Hands")
+    while True:
+        cap = cv2.VideoCapture(path)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame = cv2.flip(frame, 1)
+            result = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            frame_hands = []
+            for hand_idx, hand_landmarks in enumerate(result.multi_hand_landmarks or []):
+                label = "Unknown"
+                if result.multi_handedness and hand_idx < len(result.multi_handedness):
+                    label = result.multi_handedness[hand_idx].classification[0].label
+                frame_hands.append((label, hand_landmarks.landmark))
+            yield frame_hands
+        cap.release()
+
+
+class FrameRenderer:
+    """Per-frame drawing work of hand_detection_android.py's loop, for --render"""
+
+    def __init__(self, width=640, height=480, preview_port=8090):
+        import cv2
+        import mediapipe as mp
+        import numpy as np
+        from mediapipe.framework.formats import landmark_pb2
+
+        from preview import PreviewDisplay
+
+        self.cv2 = cv2
+        self.np = np
+        self.landmark_pb2 = landmark_pb2
+        self.mp_drawing = mp.solutions.drawing_utils
+        self.connections = mp.solutions.hands.HAND_CONNECTIONS
+        self.size = (height, width, 3)
+        self.preview = PreviewDisplay("Soak test", mode="mjpeg", fps=15, mjpeg_port=preview_port)
+        self.preview.start()
+
+    def render(self, frame_hands, controller, now):
+        cv2 = self.cv2
+        # A new frame per capture, like the camera loop
+        frame = self.np.zeros(self.size, dtype=self.np.uint8)
+        for label, landmarks in frame_hands:
+            if label != "Right":
+                cv2.putText(frame, "Left hand detected - Skipping", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                continue
+            landmark_list = self.landmark_pb2.NormalizedLandmarkList()
+            for lm in landmarks:
+                landmark_list.landmark.add(x=lm.x, y=lm.y, z=lm.z)
+            self.mp_drawing.draw_landmarks(frame, landmark_list, self.connections)
+            states = gestures.finger_states(landmarks)
+            for row, (name, value) in enumerate(states.items()):
+                cv2.putText(frame, f"{name}: {value}", (50, 260 + 30 * row), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+            heart = gestures.heart_gesture_checks(landmarks, states, controller.detector.thresholds)
+            cv2.putText(frame, f"Thumb-Index Dist: {heart['tips_dist']:.3f}", (50, 410),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        for event, action, outcome in controller.outcomes:
+            cv2.putText(frame, f"{action}: {outcome}", (50, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 165, 0), 3)
+        cv2.putText(frame, f"Actions: {controller.actions}  Sim time: {now:.1f}s",
+                    (10, frame.shape[0] - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        self.preview.show(frame)
+
+    def close(self):
+        self.preview.stop()
+
+
+def read_rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS reports bytes
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test the controller logic for leaks")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--landmarks", help="Recorded session .npz from batch_annotate.py")
+    source.add_argument("--video", help="Video file to replay through MediaPipe Hands")
+    parser.add_argument("--fps", type=float, default=30.0, help="Simulated camera frame rate")
+    parser.add_argument("--hours", type=float, default=4.0, help="Simulated duration")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Throttle to this multiple of real time (0 = as fast as possible)")
+    parser.add_argument("--sample-minutes", type=float, default=10.0, help="Simulated time between samples")
+    parser.add_argument("--warmup-minutes", type=float, default=10.0, help="Simulated time before the baseline sample")
+    parser.add_argument("--rss-budget-mb", type=float, default=50.0, help="Allowed RSS growth after warm-up")
+    parser.add_argument("--heap-budget-mb", type=float, default=10.0, help="Allowed Python heap growth after warm-up")
+    parser.add_argument("--max-threads", type=int, default=8, help="Allowed number of live threads")
+    parser.add_argument("--device-latency", type=float, default=0.05, help="Simulated ADB latency per device call")
+    parser.add_argument("--tracker-interval", type=float, default=0.1,
+                        help="Wall-clock seconds between foreground app polls of the app tracker")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip Python heap tracking (lower overhead)")
+    parser.add_argument("--csv", help="Write samples to this CSV file")
+    parser.add_argument("--render", action="store_true",
+                        help="Also run the main loop's per-frame drawing and preview encoding")
+    parser.add_argument("--render-port", type=int, default=8090, help="MJPEG preview port used by --render")
+    args = parser.parse_args()
+
+    frames = replay_landmarks(args.landmarks) if args.landmarks else replay_video(args.video)
+    device = FakeDevice(latency=args.device_latency)
+    app_tracker = ForegroundAppTracker(device, refresh_interval=args.tracker_interval)
+    app_tracker.start()
+    # The simulated clock does not advance during the like's double tap
+    controller = AndroidController(device, app_tracker=app_tracker, sleep=lambda seconds: None)
+    renderer = FrameRenderer(preview_port=args.render_port) if args.render else None
+
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+    total_frames = int(args.hours * 3600 * args.fps)
+    sample_every = max(1, int(args.sample_minutes * 60 * args.fps))
+    warmup_frames = int(args.warmup_minutes * 60 * args.fps)
+
+    samples = []
+    baseline = None
+    baseline_snapshot = None
+    compared = 0  # Samples checked against the baseline
+    failures = []
+    last_blocks = sys.getallocatedblocks()
+    last_frame = 0
+    started = time.perf_counter()
+
+    for frame_idx in range(total_frames):
+        now = frame_idx / args.fps
+        frame_hands = next(frames)
+        controller.step(frame_hands, now)
+        if renderer is not None:
+            renderer.render(frame_hands, controller, now)
+        if args.speed > 0:
+            # Keep the replay at speed x real time
+            lag = now / args.speed - (time.perf_counter() - started)
+            if lag > 0:
+                time.sleep(lag)
+
+        # Sample on the interval, at the end of the warm-up and on the last frame
+        if ((frame_idx + 1) % sample_every and frame_idx + 1 != warmup_frames and
+                frame_idx + 1 != total_frames):
+            continue
+        blocks = sys.getallocatedblocks()
+        sample = {
+            "sim_hours": round(now / 3600, 3),
+            "frames": frame_idx + 1,
+            "rss_mb": round(read_rss_mb(), 2),
+            "heap_mb": round(tracemalloc.get_traced_memory()[0] / 2**20, 3) if tracemalloc.is_tracing() else 0.0,
+            "blocks_per_frame": round((blocks - last_blocks) / max(frame_idx + 1 - last_frame, 1), 4),
+            "threads": threading.active_count(),
+            "actions": controller.actions,
+            "wall_s": round(time.perf_counter() - started, 1),
+        }
+        last_blocks = blocks
+        last_frame = frame_idx + 1
+        samples.append(sample)
+        print(" ".join(f"{key}={value}" for key, value in sample.items()))
+
+        if baseline is None:
+            if frame_idx + 1 >= warmup_frames:
+                baseline = sample
+                if tracemalloc.is_tracing():
+                    baseline_snapshot = tracemalloc.take_snapshot()
+        else:
+            compared += 1
+            if sample["rss_mb"] - baseline["rss_mb"] > args.rss_budget_mb:
+                failures.append(f"RSS grew {sample['rss_mb'] - baseline['rss_mb']:.1f} MB (budget {args.rss_budget_mb} MB)")
+            if sample["heap_mb"] - baseline["heap_mb"] > args.heap_budget_mb:
+                failures.append(f"Python heap grew {sample['heap_mb'] - baseline['heap_mb']:.2f} MB (budget {args.heap_budget_mb} MB)")
+        if sample["threads"] > args.max_threads:
+            failures.append(f"{sample['threads']} live threads (budget {args.max_threads})")
+        if failures:
+            break
+
+    app_tracker.stop()
+    if renderer is not None:
+        renderer.close()
+    if not failures and not compared:
+        failures.append("no sample after the warm-up baseline; run longer than --warmup-minutes "
+                        "with at least one --sample-minutes interval after it")
+
+    if baseline_snapshot is not None:
+        print("\nTop Python allocators since warm-up:")
+        for stat in tracemalloc.take_snapshot().compare_to(baseline_snapshot, "lineno")[:10]:
+            print(f"  {stat}")
+    print(f"\nDevice calls: {device.calls}")
+
+    if args.csv and samples:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(samples[0]))
+            writer.writeheader()
+            writer.writerows(samples)
+
+    if failures:
+        print("\nSOAK FAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\nSoak passed: {total_frames} frames ({args.hours} simulated hours)")
+
+
+if __name__ == "__main__":
+    main()
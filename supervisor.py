@@ -0,0 +1,290 @@
+"""Camera and device supervision with warm reconnect.
+
+A failed cap.read() or a dropped ADB link no longer ends the session.
+CameraSupervisor and DeviceSupervisor notice the failure, reopen the camera
+or reconnect the device with exponential backoff on a background thread and
+swap the new handle in. Everything else the process has built up (the Hands
+graph, trackers, rate limiters, app state cache) stays alive, so recovery
+costs a camera open or an ADB handshake instead of a cold start.
+
+While a resource is down the processing loop keeps running: read() returns
+no frame and device calls fail fast with DeviceUnavailable instead of
+waiting for ADB timeouts. Disconnect / reconnect counts and downtime are
+available from metrics() (served as "status" on the control socket, see
+preview.py) and summary(), which the scripts print on exit.
+"""
+import threading
+import time
+
+from camera_setup import open_camera
+
+
+class DeviceUnavailable(ConnectionError):
+    """Raised for device calls while the device is reconnecting"""
+
+
+class Backoff:
+    """Reconnect delays: initial, initial * factor, ... capped at maximum"""
+
+    def __init__(self, initial=0.5, maximum=10.0, factor=2.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.delay = initial
+
+    def next(self):
+        delay = self.delay
+        self.delay = min(self.maximum, self.delay * self.factor)
+        return delay
+
+    def reset(self):
+        self.delay = self.initial
+
+
+class _Supervisor:
+    """Connected → down → background reconnect with backoff → connected"""
+
+    name = "Resource"
+
+    def __init__(self, backoff=None, on_reconnect=None):
+        self.backoff = backoff if backoff is not None else Backoff()
+        self.on_reconnect = on_reconnect  # Called after every successful reconnect
+        self.connected = False
+        self.disconnects = 0
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.last_outage = 0.0  # Seconds, most recent completed outage
+        self._downtime = 0.0
+        self._down_since = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _reconnect(self):
+        """One reconnect attempt; True when the resource is usable again"""
+        raise NotImplementedError
+
+    def _mark_down(self, reason):
+        """Record an outage and start reconnecting (no-op while already down)"""
+        with self._lock:
+            if not self.connected or self._stop_event.is_set():
+                return
+            self.connected = False
+            self.disconnects += 1
+            self._down_since = time.perf_counter()
+        print(f"{self.name}: {reason}; reconnecting in the background")
+        self._start_reconnect()
+
+    def _start_reconnect(self):
+        self._thread = threading.Thread(target=self._run, name=f"{self.name.lower()}-reconnect", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        self.backoff.reset()
+        while not self._stop_event.is_set():
+            try:
+                ok = self._reconnect()
+                error = "not available"
+            except Exception as e:
+                ok = False
+                error = e
+            if ok:
+                with self._lock:
+                    outage = time.perf_counter() - self._down_since
+                    self._downtime += outage
+                    self.last_outage = outage
+                    self._down_since = None
+                    self.reconnects += 1
+                    self.connected = True
+                print(f"{self.name}: reconnected after {outage:.1f}s")
+                if self.on_reconnect is not None:
+                    self.on_reconnect()
+                return
+            self.failed_attempts += 1
+            delay = self.backoff.next()
+            print(f"{self.name}: reconnect failed ({error}), retrying in {delay:.1f}s")
+            self._stop_event.wait(delay)
+
+    def downtime(self):
+        """Total seconds spent disconnected, including a running outage"""
+        with self._lock:
+            ongoing = time.perf_counter() - self._down_since if self._down_since is not None else 0.0
+            return self._downtime + ongoing
+
+    def metrics(self):
+        return {
+            "connected": self.connected,
+            "disconnects": self.disconnects,
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "downtime_s": round(self.downtime(), 3),
+            "last_outage_s": round(self.last_outage, 3),
+        }
+
+    def summary(self):
+        return (f"{self.name}: {self.disconnects} disconnects, {self.reconnects} reconnects "
+                f"({self.failed_attempts} failed attempts), {self.downtime():.1f}s downtime")
+
+    def stop(self):
+        """Stop reconnecting (a running attempt finishes in the background)"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+
+class CameraSupervisor(_Supervisor):
+    """cap.read() that survives camera failures.
+
+    max_failures consecutive failed reads count as an outage; the camera is
+    then released and reopened in the background with its cached capture
+    profile (see camera_setup.py), measuring only reconnect_probe_frames
+    frames instead of the full probe.
+    """
+
+    name = "Camera"
+
+    def __init__(self, index=0, max_failures=3, reconnect_probe_frames=5, backoff=None, on_reconnect=None,
+                 **open_kwargs):
+        super().__init__(backoff, on_reconnect)
+        self.index = index
+        self.max_failures = max_failures
+        self.reconnect_probe_frames = reconnect_probe_frames
+        self.open_kwargs = open_kwargs  # Passed on to open_camera (candidates, cache_path, ...)
+        self.cap = None
+        self.profile = None
+        self.measured_fps = 0.0
+        self._failures = 0
+
+    def open(self):
+        """Open the camera at startup; when that fails, keep retrying in the background"""
+        self.cap, self.profile, self.measured_fps = open_camera(self.index, **self.open_kwargs)
+        if self.cap.isOpened():
+            self.connected = True
+        else:
+            self.cap.release()
+            self.cap = None
+            print(f"{self.name}: not available yet; retrying in the background")
+            self._down_since = time.perf_counter()
+            self._start_reconnect()
+        return self
+
+    def read(self):
+        """(ret, frame) like cap.read(); (False, None) while the camera is down"""
+        if not self.connected:
+            return False, None
+        ret, frame = self.cap.read()
+        if ret:
+            self._failures = 0
+            return ret, frame
+        self._failures += 1
+        if self._failures >= self.max_failures:
+            self._mark_down(f"{self._failures} consecutive reads failed")
+        return False, None
+
+    def _reconnect(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        cap, profile, measured_fps = open_camera(self.index, probe_frames=self.reconnect_probe_frames,
+                                                 **self.open_kwargs)
+        if not cap.isOpened() or not cap.read()[0]:
+            cap.release()
+            return False
+        self.profile, self.measured_fps = profile, measured_fps
+        self._failures = 0
+        # Publish the capture before connected flips (read() checks connected first)
+        self.cap = cap
+        return True
+
+    def release(self):
+        self.stop()
+        if self.cap is not None:
+            self.cap.release()
+
+
+class DeviceSupervisor(_Supervisor):
+    """Keeps a uiautomator2 device connected.
+
+    connect is called without arguments and returns a device, e.g.
+    u2.connect or lambda: u2.connect("192.168.1.100:5555"). Use the proxy
+    returned by connect() in place of the device: it forwards to the current
+    connection, so holders of the proxy (ForegroundAppTracker, ...) keep
+    working across reconnects. A failing device call triggers a background
+    health check (device.info); when that fails too, the device counts as
+    disconnected and is reconnected with backoff.
+    """
+
+    name = "Device"
+
+    def __init__(self, connect, backoff=None, on_reconnect=None):
+        super().__init__(backoff, on_reconnect)
+        self._connect = connect
+        self._device = None
+        self._checking = False
+        self.errors = 0  # Failed device calls seen by the proxy
+
+    def connect(self):
+        """Initial connection (raises on failure); returns the device proxy"""
+        self._device = self._connect()
+        self._device.info
+        self.connected = True
+        return _DeviceProxy(self)
+
+    def current(self):
+        """The live device, or DeviceUnavailable while reconnecting"""
+        device = self._device
+        if not self.connected or device is None:
+            raise DeviceUnavailable("device is reconnecting")
+        return device
+
+    def report_error(self, error):
+        """A device call failed: check the connection in the background"""
+        self.errors += 1
+        with self._lock:
+            if self._checking or not self.connected:
+                return
+            self._checking = True
+        threading.Thread(target=self._check, args=(error,), name="device-check", daemon=True).start()
+
+    def _check(self, error):
+        try:
+            self._device.info
+        except Exception as e:
+            self._mark_down(f"connection lost after \"{error}\" ({e})")
+        finally:
+            self._checking = False
+
+    def _reconnect(self):
+        device = self._connect()
+        device.info
+        self._device = device
+        return True
+
+
+class _DeviceProxy:
+    """Forwards attribute access and calls to the supervised device"""
+
+    def __init__(self, supervisor):
+        self._supervisor = supervisor
+
+    def __getattr__(self, name):
+        supervisor = self._supervisor
+        device = supervisor.current()
+        try:
+            # Properties such as info already talk to the device here
+            value = getattr(device, name)
+        except AttributeError:
+            raise
+        except Exception as e:
+            supervisor.report_error(e)
+            raise
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            try:
+                return value(*args, **kwargs)
+            except Exception as e:
+                supervisor.report_error(e)
+                raise
+        return call
@@ -0,0 +1,165 @@
+"""Synthetic 21-landmark hand poses and motion trajectories.
+
+Generates deterministic landmark streams (same seed, same stream) for the
+gestures the controllers understand: open hand, fist, OK, scroll pose,
+index point, finger heart and two-hand cross arms, with controllable noise,
+frame rate, handedness and dropouts. Frames are lists of
+(handedness, landmarks) like the rest of the offline tools use, so they feed
+straight into gestures.py / controller.py without a camera or video.
+
+Coordinates follow MediaPipe: normalized image coordinates of the mirrored
+preview, y pointing down.
+"""
+import math
+import random
+from collections import namedtuple
+
+import gestures
+from gestures import Landmark
+
+# One piece of a trajectory: hold/move a pose from wrist position start to end
+Segment = namedtuple("Segment", "pose duration start end")
+
+# Finger layout of a right hand in units of the wrist → middle MCP length:
+# MCP offset from the wrist, splay angle (deg, clockwise from up) and segment lengths
+FINGERS = {
+    "index": ((-0.35, -1.0), -8, (0.45, 0.28, 0.25)),
+    "middle": ((0.0, -1.05), 0, (0.5, 0.32, 0.26)),
+    "ring": ((0.3, -0.98), 6, (0.47, 0.3, 0.25)),
+    "pinky": ((0.55, -0.85), 14, (0.36, 0.22, 0.2)),
+}
+THUMB_CMC = (-0.45, -0.35)
+THUMB_LENGTHS = (0.4, 0.4, 0.45)
+
+# Cumulative joint flexion (deg) of an extended / folded finger
+EXTENDED = (0, 0, 0)
+FOLDED = (80, 170, 250)
+
+# Per pose: which fingers are extended, thumb segment angles (deg, image coords),
+# and an index splay override
+POSES = {
+    "open": ({"index", "middle", "ring", "pinky"}, (-120, -135, -140), None),
+    "fist": (set(), (-60, -10, 20), None),
+    "point": ({"index"}, (-60, -10, 20), 0),
+    "scroll": ({"index", "middle"}, (-60, -10, 20), None),
+    "heart": ({"index"}, (-80, -30, -20), 15),
+    "ok": ({"middle", "ring", "pinky"}, (-80, -50, -30), None),
+}
+
+
+def hand_landmarks(pose, wrist=(0.5, 0.7), size=0.1, handedness="Right"):
+    """21 landmarks of a static pose; size = wrist → middle MCP length (normalized)"""
+    extended, thumb_angles, index_splay = POSES[pose]
+    wx, wy = wrist
+    points = [None] * gestures.NUM_LANDMARKS
+    points[gestures.WRIST] = (wx, wy, 0.0)
+
+    # Thumb: CMC, MCP, IP, TIP roughly in the image plane
+    x, y = wx + THUMB_CMC[0] * size, wy + THUMB_CMC[1] * size
+    points[1] = (x, y, -0.01)
+    for joint, (angle, length) in enumerate(zip(thumb_angles, THUMB_LENGTHS), start=2):
+        x += math.cos(math.radians(angle)) * length * size
+        y += math.sin(math.radians(angle)) * length * size
+        points[joint] = (x, y, -0.02)
+
+    # Fingers: flexion curls toward the camera, so it shortens the projected finger
+    for finger_idx, (name, (offset, splay, lengths)) in enumerate(FINGERS.items()):
+        if name == "index" and index_splay is not None:
+            splay = index_splay
+        base = 5 + finger_idx * 4
+        dx, dy = math.sin(math.radians(splay)), -math.cos(math.radians(splay))
+        x, y, z = wx + offset[0] * size, wy + offset[1] * size, 0.0
+        points[base] = (x, y, z)
+        curl = EXTENDED if name in extended else FOLDED
+        for joint, (flex, length) in enumerate(zip(curl, lengths), start=1):
+            along = math.cos(math.radians(flex)) * length * size
+            x += dx * along
+            y += dy * along
+            z -= math.sin(math.radians(flex)) * length * size
+            points[base + joint] = (x, y, z)
+
+    if pose == "ok":
+        # Index bends down so its tip touches the thumb tip
+        tx, ty, tz = points[gestures.THUMB_TIP]
+        mx, my, mz = points[5]
+        points[gestures.INDEX_FINGER_TIP] = (tx + 0.005, ty - 0.005, tz)
+        points[6] = (mx + (tx - mx) * 0.2, my - 0.35 * size, mz - 0.01)
+        points[gestures.INDEX_FINGER_DIP] = (mx + (tx - mx) * 0.7, my - 0.3 * size, mz - 0.02)
+
+    if handedness == "Left":
+        # Mirror image of the right hand around the wrist
+        points = [(2 * wx - px, py, pz) for px, py, pz in points]
+    return [Landmark(*p) for p in points]
+
+
+def _lerp(a, b, t):
+    return (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t)
+
+
+def generate(segments, fps=30.0, noise=0.0, dropout=0.0, handedness="Right", seed=0, size=0.1):
+    """Yield (timestamp, hands) frames for a list of Segments.
+
+    pose "cross_arms" yields both hands (each pointing, wrists crossed) and
+    pose None yields an empty frame. noise is the std-dev of Gaussian jitter
+    added to x/y, dropout the probability that a frame has no hands.
+    """
+    rng = random.Random(seed)
+    frame_idx = 0
+    for segment in segments:
+        frames = max(1, int(round(segment.duration * fps)))
+        for idx in range(frames):
+            t = idx / max(frames - 1, 1)
+            wrist = _lerp(segment.start, segment.end, t)
+            if segment.pose is None or rng.random() < dropout:
+                hands = []
+            elif segment.pose == "cross_arms":
+                # Left hand shows up right of the right hand when arms are crossed
+                hands = [("Right", hand_landmarks("point", (wrist[0] - 0.05, wrist[1]), size, "Right")),
+                         ("Left", hand_landmarks("point", (wrist[0] + 0.05, wrist[1]), size, "Left"))]
+            else:
+                hands = [(handedness, hand_landmarks(segment.pose, wrist, size, handedness))]
+            if noise and hands:
+                hands = [(label, [Landmark(lm.x + rng.gauss(0, noise), lm.y + rng.gauss(0, noise), lm.z)
+                                  for lm in landmarks])
+                         for label, landmarks in hands]
+            yield frame_idx / fps, hands
+            frame_idx += 1
+
+
+# Ready-made scenarios: (segments, index of the segment where the decisive gesture starts)
+SCENARIOS = {
+    "idle": ([Segment("open", 2.0, (0.5, 0.7), (0.5, 0.7))], None),
+    "ok": ([Segment("open", 0.5, (0.5, 0.7), (0.5, 0.7)),
+            Segment("ok", 1.0, (0.5, 0.7), (0.5, 0.7)),
+            Segment("open", 0.5, (0.5, 0.7), (0.5, 0.7))], 1),
+    "like": ([Segment("ok", 0.5, (0.5, 0.7), (0.5, 0.7)),
+              Segment("open", 0.3, (0.5, 0.7), (0.5, 0.7)),
+              Segment("point", 0.3, (0.5, 0.7), (0.5, 0.7)),
+              Segment("heart", 1.0, (0.5, 0.7), (0.5, 0.7))], 3),
+    "scroll_down": ([Segment("open", 0.3, (0.5, 0.7), (0.5, 0.7)),
+                     Segment("scroll", 0.3, (0.5, 0.7), (0.5, 0.7)),
+                     Segment("scroll", 0.3, (0.5, 0.7), (0.5, 0.6)),
+                     Segment("scroll", 0.3, (0.5, 0.6), (0.5, 0.6))], 2),
+    "scroll_up": ([Segment("open", 0.3, (0.5, 0.6), (0.5, 0.6)),
+                   Segment("scroll", 0.3, (0.5, 0.6), (0.5, 0.6)),
+                   Segment("scroll", 0.3, (0.5, 0.6), (0.5, 0.7)),
+                   Segment("scroll", 0.3, (0.5, 0.7), (0.5, 0.7))], 2),
+    "swipe_right": ([Segment("scroll", 0.3, (0.45, 0.7), (0.45, 0.7)),
+                     Segment("scroll", 0.1, (0.45, 0.7), (0.55, 0.7)),
+                     Segment("scroll", 0.3, (0.55, 0.7), (0.55, 0.7))], 1),
+    "swipe_left": ([Segment("scroll", 0.3, (0.55, 0.7), (0.55, 0.7)),
+                    Segment("scroll", 0.1, (0.55, 0.7), (0.4, 0.7)),
+                    Segment("scroll", 0.3, (0.4, 0.7), (0.4, 0.7))], 1),
+    "cross_arms": ([Segment("ok", 0.5, (0.5, 0.7), (0.5, 0.7)),
+                    Segment(None, 0.3, (0.5, 0.7), (0.5, 0.7)),
+                    Segment("cross_arms", 1.0, (0.5, 0.6), (0.5, 0.6))], 2),
+}
+
+
+def scenario_onset(name, fps=30.0):
+    """Timestamp of the first frame of a scenario's decisive segment (None for idle)"""
+    segments, decisive = SCENARIOS[name]
+    if decisive is None:
+        return None
+    frames = sum(max(1, int(round(s.duration * fps))) for s in segments[:decisive])
+    return frames / fps